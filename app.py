@@ -1,27 +1,55 @@
+import logging
+import time
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 
 
 # importing all the services
 try:
     from services.language_service import handle_language_pipeline
-    from services.summary_generator import summarize_article
+    from services.summary_generator import summarize_article_within, summarize_article_extractive
     from services.location_extractor import extract_locations
     from services.glossary_builder import build_glossary
-    from services.file_handler import write_temp_file, delete_temp_file
+    from services.localization import localize_insights
+    from services.result_cache import get_result_cache
+    from services.artifact_store import get_artifact_store
+    from services.pipeline_scheduler import IO, Stage, run_stages
+    from services.article_processor import fetch_article
+    from services.analysis_service import make_article_data, reuse_analysis
+    from services.near_duplicates import get_duplicate_index, minhash
+    from services.article_index import get_article_index
+    from components import metrics, model_client
+    from components.settings import LATENCY_BUDGET_S
+    from components.summarizer import summary_failed
     REAL_SERVICES_AVAILABLE = True
 except ImportError:
     REAL_SERVICES_AVAILABLE = False
 
+logger = logging.getLogger(__name__)
+
+
+def index_article(result_key, url, article_data):
+    """Adds the article to the cross-article index; a broken index must not break the analysis."""
+    try:
+        get_article_index().add_article(result_key, url, article_data)
+    except Exception as e:
+        logger.warning("Could not add %s to the article index: %s", url, e)
+
+
+# models load in a background thread once per process, so the page renders before the weights are ready
+# (nothing is loaded here when EXPLAINEE_MODEL_SERVER points at a shared model server)
+if REAL_SERVICES_AVAILABLE:
+    model_client.warm_up()
+    metrics.configure_from_env()
+
 
 
 # initializing the session state - for better experience during language switch
 
+# the session keeps only a handle into the process-wide artifact store, not its own copy of the article
 if "analysis_complete" not in st.session_state:
     st.session_state.analysis_complete = False
-    st.session_state.article_data = {}
+    st.session_state.article = None
 
 
 
@@ -166,6 +194,12 @@ with st.sidebar:
         submitted = st.form_submit_button("✨ Analyze Article")
     st.markdown("---")
     language_toggle_placeholder = st.empty()
+    if REAL_SERVICES_AVAILABLE:
+        st.caption("Models: " + ", ".join(f"{name} {state}" for name, state in model_client.status().items()))
+        latency_budget = st.slider("Time budget (seconds, 0 = no limit)", 0, 120, int(LATENCY_BUDGET_S),
+                                   help="Past the budget a quick extractive summary is shown and "
+                                        "remaining glossary lookups are skipped.")
+    show_debug = st.checkbox("Show timing breakdown", value=False)
 
 
 # core logic handling
@@ -174,79 +208,153 @@ if submitted and url:
         if not REAL_SERVICES_AVAILABLE:
             st.error("Service files are missing.")
             st.stop()
+        # the budget covers the whole request, fetching included
+        deadline = time.monotonic() + latency_budget if latency_budget else None
         
-        with st.spinner("Fetching and processing article... This may take a few moments."):
+        with st.spinner("Fetching and processing article... This may take a few moments."), \
+                metrics.trace(url=url) as request_trace:
+            # the breakdown is kept for the debug panel, also when the analysis ends early
+            st.session_state.last_trace = request_trace
             # Step 1: Fetch and parse
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, "html.parser")
-            article_text = "\n\n".join(p.get_text().strip() for p in soup.find_all("p") if p.get_text().strip())
+            title, article_text = fetch_article(url, timeout=30)
             if not article_text:
                 st.warning("Could not extract paragraph text.")
                 st.stop()
 
-            # Step 2: Handle language and get file paths
-            lang_code, lang_name, translated_path, was_translated = handle_language_pipeline(article_text)
-            original_path = write_temp_file(article_text)
+            # Reuse a finished analysis of the same URL and text: one another session holds in memory,
+            # or one from the on-disk result cache
+            result_cache = get_result_cache()
+            artifact_store = get_artifact_store()
+            result_key = result_cache.make_key(url, article_text)
+            handle = artifact_store.get(result_key)
+            if handle is None:
+                cached_data = result_cache.get_by_key(result_key)
+                handle = artifact_store.put(result_key, cached_data) if cached_data is not None else None
+            # every analysed article is kept in the cross-article index (a no-op when it already is)
+            if handle is not None:
+                index_article(result_key, url, handle.meta)
+                st.session_state.article = handle
+                st.session_state.analysis_complete = True
+                st.rerun()
+
+            # A syndicated copy of an article analysed before: reuse that analysis and process only
+            # the paragraphs that differ
+            duplicate_index = get_duplicate_index()
+            signature = minhash(article_text)
+            match = duplicate_index.find(article_text, signature)
+            previous = result_cache.get_by_key(match.result_key) if match else None
+            if match and previous is None:
+                duplicate_index.discard(match.doc_id)  # its analysis was evicted from the result cache
+            reused = reuse_analysis(previous, article_text, title, urlparse(url).netloc, url) if previous else None
+            if reused is not None:
+                reused["reused"].update(url=match.url, similarity=round(match.similarity, 3))
+                st.session_state.article = artifact_store.put(result_key, reused)
+                st.session_state.analysis_complete = True
+                # not cached or indexed as a near-duplicate source: reusing a reuse would let changes add up
+                index_article(result_key, url, reused)
+                st.rerun()
+
+            # Step 2: Handle language; the article travels between stages in memory
+            source = urlparse(url).netloc
+            context = handle_language_pipeline(article_text, title=title, source=source, url=url)
+            lang_name = context.lang_name
             
-            # --- MODIFIED: Generate insights for BOTH languages ---
-            with st.spinner("Generating insights in English..."):
-                english_summary = summarize_article(translated_path)
-                english_glossary = build_glossary(translated_path, max_entities=15)
+            # --- Generate insights for BOTH languages; independent stages run concurrently ---
+            # a model server batches concurrent calls itself, so they need no local lane
+            summarizer_lane, spacy_lane = (IO, IO) if model_client.remote_enabled() else ("summarizer", "spacy")
+            stages = [
+                # None when the model misses the deadline; the extractive summary then stands in
+                Stage("abstractive_summary", lambda: summarize_article_within(context, deadline, summarizer_lane)),
+                # one parse of the English text, shared by glossary, locations and the extractive fallback
+                Stage("english_analysis", lambda: context.analysis, lane=spacy_lane),
+                Stage("english_summary",
+                      lambda abstractive, analysis: abstractive or summarize_article_extractive(context, analysis),
+                      deps=["abstractive_summary", "english_analysis"]),
+                Stage("english_glossary", lambda _: build_glossary(context, max_entities=15, deadline=deadline),
+                      deps=["english_analysis"]),
                 # English locations are the standard
-                locations = extract_locations(translated_path)
-
-            original_summary = ""
-            original_glossary = {}
-            if was_translated:
-                with st.spinner(f"Generating insights in {lang_name}..."):
-                    original_summary = summarize_article(original_path)
-                    original_glossary = build_glossary(original_path, max_entities=15)
-            else:
-                # If not translated, original is the same as English
-                original_summary = english_summary
-                original_glossary = english_glossary
-
-            # Step 3: Read content for display
-            with open(translated_path, 'r', encoding='utf-8') as f_en, open(original_path, 'r', encoding='utf-8') as f_orig:
-                english_content = f_en.read()
-                original_content = f_orig.read()
-            
-            # --- MODIFIED: Store all versions in st.session_state ---
-            st.session_state.article_data = {
-                "title": soup.title.string if soup.title else "No title found",
-                "source": urlparse(url).netloc,
-                "locations": locations,
-                "lang_code": lang_code,
-                "lang_name": lang_name,
-                "was_translated": was_translated,
-                "english_content": english_content,
-                "original_content": original_content,
-                "english_summary": english_summary,
-                "original_summary": original_summary,
-                "english_glossary": english_glossary,
-                "original_glossary": original_glossary,
+                Stage("locations", lambda _: extract_locations(context), deps=["english_analysis"]),
+            ]
+            if context.was_translated:
+                # models run once on the English text; only the short outputs are translated back
+                stages.append(Stage(
+                    "original_insights",
+                    lambda summary, glossary: localize_insights(summary, glossary, context.lang_code),
+                    deps=["english_summary", "english_glossary"],
+                ))
+
+            stage_labels = {
+                "abstractive_summary": "Summary model",
+                "english_summary": "Summary (English)",
+                "english_analysis": "Entities (English)",
+                "english_glossary": "Glossary (English)",
+                "locations": "Locations",
+                "original_insights": f"Summary & glossary ({lang_name})",
             }
+            results = {}
+            with st.status("Generating insights...", expanded=True) as progress:
+                # partial results stream in as each stage finishes
+                for result in run_stages(stages):
+                    results[result.name] = result
+                    if not result.ok:
+                        raise RuntimeError(f"{stage_labels[result.name]} failed: {result.error}")
+                    if result.name == "abstractive_summary" and result.value is None:
+                        reason = "failed" if context.artifacts.get("summary_error") else "out of time"
+                        progress.write(f"⏩ {stage_labels[result.name]} {reason}, using a quick summary")
+                        continue
+                    progress.write(f"✅ {stage_labels[result.name]} ready ({result.seconds:.1f}s)")
+                    if result.name == "english_summary":
+                        progress.write(result.value)
+                progress.update(label="Insights ready", state="complete")
+
+            # degraded steps are reported with the result
+            tiers = {}
+            if results["abstractive_summary"].value is None:
+                tiers["summary"] = "extractive"
+                if context.artifacts.get("summary_error"):
+                    tiers["summary_error"] = context.artifacts["summary_error"]
+            if context.artifacts.get("glossary_skipped"):
+                tiers["glossary_skipped"] = len(context.artifacts["glossary_skipped"])
+
+            original_summary = original_glossary = None
+            if context.was_translated:
+                original_summary, original_glossary = results["original_insights"].value
+            # If not translated, original is the same as English
+            article_data = make_article_data(
+                context,
+                results["english_summary"].value,
+                results["english_glossary"].value,
+                results["locations"].value,
+                original_summary,
+                original_glossary,
+                tiers,
+            )
+            # a result cut short by the budget (or with a failed summary) is not reused; the next
+            # request may get the full one
+            if tiers or summary_failed(article_data["english_summary"]):
+                st.session_state.article = artifact_store.put(f"{result_key}#partial-{time.time()}", article_data)
+            else:
+                st.session_state.article = artifact_store.put(result_key, article_data)
+                result_cache.put(url, article_text, article_data)
+                duplicate_index.add(url, article_text, result_key, signature)
+            # the entities are complete even when the summary or glossary was cut short
+            index_article(result_key, url, article_data)
             st.session_state.analysis_complete = True
-            
-            # Step 4: Cleanup
-            delete_temp_file(translated_path)
-            delete_temp_file(original_path)
-            
             st.rerun()
 
     except Exception as e:
         st.error(f"An error occurred: {e}")
         st.session_state.analysis_complete = False
-        st.session_state.article_data = {}
+        st.session_state.article = None
 
 # diplay logic
 if not st.session_state.analysis_complete:
     display_welcome_screen()
     st.stop()
 
-# Retrieve all data from session state
-data = st.session_state.article_data
+# Retrieve the shared article; its text is decoded only where it is shown
+article = st.session_state.article
+data = article.meta
 
 # The radio button toggle
 if data['was_translated']:
@@ -260,14 +368,30 @@ else:
 if show_english == 'English':
     summary_to_show = data['english_summary']
     glossary_to_show = data['english_glossary']
-    content_to_show = data['english_content']
+    content_field = 'english_content'
     display_lang = 'English'
 else:
     summary_to_show = data['original_summary']
     glossary_to_show = data['original_glossary']
-    content_to_show = data['original_content']
+    content_field = 'original_content'
     display_lang = data['lang_name']
 
+# Debug panel: where the time went for the last analysis
+if show_debug and st.session_state.get("last_trace") is not None:
+    with st.expander("⏱️ Timing breakdown (last analysis)", expanded=True):
+        trace_data = st.session_state.last_trace.to_dict()
+        store_stats = get_artifact_store().stats()
+        st.caption(f"Total: {trace_data['wall_s']:.2f}s · shared articles in memory: {store_stats['articles']} "
+                   f"({store_stats['bytes'] / 1024:.0f} KiB, {store_stats['handles']} sessions)")
+        st.table(trace_data["stages"])
+        if trace_data["counters"]:
+            st.table([{"counter": k, "value": v} for k, v in sorted(trace_data["counters"].items())])
+        if trace_data["observations"]:
+            st.table([
+                {"input size": k, "count": len(v), "total": sum(v), "max": max(v)}
+                for k, v in sorted(trace_data["observations"].items())
+            ])
+
 # Display Results
 
 st.header(data['title'])
@@ -275,6 +399,9 @@ col1, col2, col3 = st.columns(3)
 col1.metric("Source", data['source'])
 col2.metric("Language", f"{data['lang_name'].split(' ')[0]} ({data['lang_code']})")
 col3.metric("Translated", "Yes" if data['was_translated'] else "No")
+if data.get('reused'):
+    st.caption(f"♻️ Reused the analysis of a near-identical article ({data['reused']['url']}); "
+               f"{data['reused']['changed_paragraphs']} of {data['reused']['paragraphs']} paragraphs were processed anew.")
 st.markdown("---")
 
 tab1, tab2, tab3 = st.tabs(["📊 Summary & Key Info", "📖 Glossary", "📄 Full Article"])
@@ -282,6 +409,10 @@ tab1, tab2, tab3 = st.tabs(["📊 Summary & Key Info", "📖 Glossary", "📄 Fu
 with tab1:
     st.subheader(f"Key Takeaways ({display_lang})")
     st.write(summary_to_show)
+    if data.get('tiers', {}).get('summary_error'):
+        st.caption("⚡ Quick extractive summary: the summarization model failed.")
+    elif data.get('tiers', {}).get('summary') == 'extractive':
+        st.caption("⚡ Quick extractive summary: the summarization model did not finish within the time budget.")
     if data['locations']:
         st.subheader("Locations Mentioned (from English text)")
         st.markdown("".join(f"<span class='location-tag'>{loc}</span>" for loc in data['locations']), unsafe_allow_html=True)
@@ -293,9 +424,11 @@ with tab2:
             st.markdown(f"**{term}**: {definition}")
     else:
         st.info("No key entities identified in this language.")
+    if data.get('tiers', {}).get('glossary_skipped'):
+        st.caption(f"{data['tiers']['glossary_skipped']} lookups were skipped to stay within the time budget.")
 
 with tab3:
     st.subheader(f"Reading Article in: {display_lang}")
     with st.container(height=500):
-        for para in content_to_show.split("\n\n"):
+        for para in article.paragraphs(content_field):
             st.markdown(f"<p style='text-align: justify;'>{para.strip()}</p>", unsafe_allow_html=True)
@@ -0,0 +1,195 @@
+"""
+Batch/offline analysis of many articles.
+
+    python batch.py urls.txt -o results.jsonl
+    python batch.py texts.jsonl -o results.jsonl --batch-size 32 --warm-cache
+    python batch.py texts.jsonl -o results.jsonl --nlp-processes 4
+
+The input is either a text file with one URL per line or a JSONL file of raw texts
+({"id": ..., "text": ..., "title": ..., "url": ...}). Results are appended to the output
+JSONL as each batch finishes; re-running with the same output skips ids already written.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from components.settings import SPACY_BATCH_SIZE, SPACY_PROCESSES
+from components.summarizer import summary_failed
+from services.article_processor import extract_article
+from services.fetcher import get_fetcher
+from services.language_service import handle_language_pipeline
+from services.analysis_service import analyze_articles
+from services.near_duplicates import get_duplicate_index
+from services.article_index import get_article_index
+from services.result_cache import get_result_cache
+
+# article texts are large; they are only written when asked for
+CONTENT_FIELDS = ("english_content", "original_content")
+
+
+def read_inputs(path, input_format):
+    """Yields {"id", "url", "text", "title"} items; text is None for URL inputs."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if input_format == "urls":
+                yield {"id": line, "url": line, "text": None, "title": None}
+            else:
+                item = json.loads(line)
+                yield {
+                    "id": str(item.get("id") or item.get("url") or line_no),
+                    "url": item.get("url"),
+                    "text": item["text"],
+                    "title": item.get("title"),
+                }
+
+
+def completed_ids(output_path):
+    """
+    Ids with a result in the output file, so a restarted run resumes where it stopped.
+    Items that failed are not counted and are retried.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                if "error" not in record:
+                    done.add(record["id"])
+            except (ValueError, KeyError):
+                continue  # a line cut short by a crash is redone
+    return done
+
+
+def drop_partial_line(output_path):
+    """Cuts a trailing line left unfinished by a crash, so appended records start on a fresh line."""
+    if not os.path.exists(output_path):
+        return
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def prefetch(items, concurrency):
+    """Downloads the pages of a batch concurrently with the async fetcher; returns {url: FetchResult or exception}."""
+    urls = [item["url"] for item in items if item["text"] is None]
+    if not urls:
+        return {}
+    return dict(zip(urls, asyncio.run(get_fetcher().fetch_many(urls, concurrency=concurrency))))
+
+
+def prepare(item, fetched):
+    """Extracts (for URLs) and runs language detection/translation for one input item."""
+    title, text = item["title"], item["text"]
+    if text is None:
+        result = fetched[item["url"]]
+        if isinstance(result, Exception):
+            raise result
+        title, text = extract_article(result.content)
+    if not text:
+        raise ValueError("Could not extract paragraph text.")
+    source = urlparse(item["url"]).netloc if item["url"] else None
+    return handle_language_pipeline(text, title=title, source=source, url=item["url"])
+
+
+def process_batch(items, args, pool):
+    fetched = prefetch(items, args.fetch_workers)
+
+    def safe_prepare(item):
+        try:
+            return prepare(item, fetched)
+        except Exception as e:
+            return e
+
+    records = []
+    contexts, ok_items = [], []
+    for item, outcome in zip(items, pool.map(safe_prepare, items)):
+        if isinstance(outcome, Exception):
+            records.append({"id": item["id"], "url": item["url"], "error": str(outcome)})
+        else:
+            contexts.append(outcome)
+            ok_items.append(item)
+
+    if contexts:
+        for item, context, data in zip(ok_items, contexts, analyze_articles(
+                contexts, nlp_batch_size=args.nlp_batch_size, nlp_processes=args.nlp_processes)):
+            if isinstance(data, Exception):
+                records.append({"id": item["id"], "url": item["url"], "error": str(data)})
+                continue
+            # a failed summary is reported in the record but not shared with the app and later runs
+            if args.warm_cache and item["url"] and not summary_failed(data["english_summary"]):
+                result_cache = get_result_cache()
+                result_cache.put(item["url"], context.original_text, data)
+                # later copies of the story on other sites can then reuse this analysis
+                result_key = result_cache.make_key(item["url"], context.original_text)
+                get_duplicate_index().add(item["url"], context.original_text, result_key)
+                get_article_index().add_article(result_key, item["url"], data)
+            record = {"id": item["id"], "url": item["url"]}
+            record.update((k, v) for k, v in data.items() if args.include_text or k not in CONTENT_FIELDS)
+            records.append(record)
+    return records
+
+
+def batched(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse a list of article URLs or raw texts in batches.")
+    parser.add_argument("input", help="file with one URL per line, or a JSONL of raw texts")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file results are appended to")
+    parser.add_argument("--format", choices=["urls", "texts"], default=None,
+                        help="input format (default: texts for .jsonl files, urls otherwise)")
+    parser.add_argument("--batch-size", type=int, default=16, help="articles analysed together")
+    parser.add_argument("--nlp-batch-size", type=int, default=SPACY_BATCH_SIZE, help="spaCy nlp.pipe batch size")
+    parser.add_argument("--nlp-processes", type=int, default=SPACY_PROCESSES, help="spaCy worker processes")
+    parser.add_argument("--fetch-workers", type=int, default=8, help="concurrent downloads and translation workers")
+    parser.add_argument("--warm-cache", action="store_true", help="also store results in the shared result cache and article index")
+    parser.add_argument("--include-text", action="store_true", help="write the article texts to the output too")
+    args = parser.parse_args(argv)
+
+    input_format = args.format or ("texts" if args.input.endswith(".jsonl") else "urls")
+    drop_partial_line(args.output)
+    done = completed_ids(args.output)
+    todo = [item for item in read_inputs(args.input, input_format) if item["id"] not in done]
+    if done:
+        print(f"Resuming: {len(done)} already done, {len(todo)} to go", file=sys.stderr)
+
+    processed = failed = 0
+    start = time.perf_counter()
+    with open(args.output, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=args.fetch_workers) as pool:
+        for batch in batched(todo, args.batch_size):
+            for record in process_batch(batch, args, pool):
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                processed += 1
+                failed += "error" in record
+            out.flush()
+            elapsed = time.perf_counter() - start
+            print(f"{processed}/{len(todo)} articles, {processed / elapsed:.2f} articles/s", file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    rate = processed / elapsed if elapsed else 0.0
+    print(f"Done: {processed} articles ({failed} failed) in {elapsed:.1f}s, {rate:.2f} articles/s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
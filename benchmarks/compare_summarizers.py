@@ -0,0 +1,167 @@
+"""
+Compares summarizer backends against the reference one on a local test set.
+
+    python -m benchmarks.compare_summarizers --backends torch quantized onnx
+    python -m benchmarks.compare_summarizers --test-set my_articles.jsonl --beams 2 --output summ.json
+
+Each backend summarizes every document; the report gives model load time, per-document latency,
+speed-up over the reference backend and ROUGE-1/2/L F1 of its summaries against the reference
+backend's. The default test set is the English text of benchmarks/corpus (non-English documents
+through the saved translations). A JSONL test set ({"id", "text", "reference"?}) may also carry
+human reference summaries, which are scored as well.
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from collections import Counter
+
+from benchmarks.run import summarize_timings
+from benchmarks.stubs import CORPUS_DIR, corpus_manifest
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def load_test_set(path=None, sizes=None):
+    """Returns [{"id", "text", "reference"}]; reference is None unless the JSONL provides one."""
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            items = [json.loads(line) for line in f if line.strip()]
+        return [{"id": str(item.get("id", i)), "text": item["text"], "reference": item.get("reference")}
+                for i, item in enumerate(items)]
+
+    from components.html_extractor import extract
+
+    with open(os.path.join(CORPUS_DIR, "translations.json"), encoding="utf-8") as f:
+        translations = json.load(f)
+    items = []
+    for entry in corpus_manifest():
+        if sizes and entry["size"] not in sizes:
+            continue
+        with open(os.path.join(CORPUS_DIR, entry["file"]), "rb") as f:
+            paragraphs = extract(f.read()).paragraphs
+        table = translations.get(entry["lang"], {})
+        text = "\n\n".join(table.get(p, p) for p in paragraphs)
+        items.append({"id": entry["name"], "text": text, "reference": None})
+    return items
+
+
+def _ngrams(tokens, n):
+    return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+
+
+def _f1(overlap, candidate_total, reference_total):
+    if not overlap or not candidate_total or not reference_total:
+        return 0.0
+    precision, recall = overlap / candidate_total, overlap / reference_total
+    return 2 * precision * recall / (precision + recall)
+
+
+def _lcs_length(a, b):
+    previous = [0] * (len(b) + 1)
+    for x in a:
+        current = [0]
+        for j, y in enumerate(b, 1):
+            current.append(previous[j - 1] + 1 if x == y else max(previous[j], current[j - 1]))
+        previous = current
+    return previous[-1]
+
+
+def rouge(candidate, reference):
+    """ROUGE-1, ROUGE-2 and ROUGE-L F1 on lowercased word tokens."""
+    cand = _WORD.findall(candidate.lower())
+    ref = _WORD.findall(reference.lower())
+    scores = {}
+    for n in (1, 2):
+        c, r = _ngrams(cand, n), _ngrams(ref, n)
+        scores[f"rouge{n}"] = _f1(sum((c & r).values()), sum(c.values()), sum(r.values()))
+    scores["rougeL"] = _f1(_lcs_length(cand, ref), len(cand), len(ref))
+    return scores
+
+
+def _mean_scores(pairs):
+    totals = Counter()
+    for candidate, reference in pairs:
+        totals.update(rouge(candidate, reference))
+    return {k: round(v / len(pairs), 4) for k, v in totals.items()} if pairs else {}
+
+
+def run_backend(name, items, options, max_length, repeat):
+    from components.summarization_backends import make_backend
+    from components.summarizer import generate_summaries
+
+    start = time.perf_counter()
+    backend = make_backend(name, options=options)
+    load_s = time.perf_counter() - start
+    # one untimed call so lazy initialisation (graph building, thread pools) is not measured
+    if items:
+        generate_summaries([items[0]["text"]], max_length=max_length, backend=backend)
+
+    samples, summaries = [], {}
+    for _ in range(repeat):
+        for item in items:
+            start = time.perf_counter()
+            summaries[item["id"]] = generate_summaries([item["text"]], max_length=max_length, backend=backend)[0]
+            samples.append(time.perf_counter() - start)
+    return {"load_s": round(load_s, 3), "latency": summarize_timings(samples), "summaries": summaries}
+
+
+def compare(backends, reference, items, options, max_length=200, repeat=1):
+    names = [reference] + [b for b in backends if b != reference]
+    results = {name: run_backend(name, items, options, max_length, repeat) for name in names}
+
+    ref = results[reference]
+    for name, result in results.items():
+        result["speedup"] = round(ref["latency"]["mean_ms"] / result["latency"]["mean_ms"], 2) \
+            if result["latency"]["mean_ms"] else 0.0
+        result["rouge_vs_reference"] = _mean_scores(
+            [(result["summaries"][i["id"]], ref["summaries"][i["id"]]) for i in items])
+        human = [(result["summaries"][i["id"]], i["reference"]) for i in items if i["reference"]]
+        if human:
+            result["rouge_vs_human"] = _mean_scores(human)
+    return results
+
+
+def print_report(results, reference):
+    print(f"{'backend':<12}{'load s':>9}{'mean ms':>11}{'p90 ms':>11}{'speedup':>9}"
+          f"{'R-1':>8}{'R-2':>8}{'R-L':>8}")
+    for name, r in results.items():
+        scores = r["rouge_vs_reference"]
+        # no scores when the test set is empty
+        rouge = "".join(f"{scores[k]:>8.3f}" if k in scores else f"{'n/a':>8}" for k in ("rouge1", "rouge2", "rougeL"))
+        print(f"{name:<12}{r['load_s']:>9.1f}{r['latency']['mean_ms']:>11.1f}{r['latency']['p90_ms']:>11.1f}"
+              f"{r['speedup']:>8.2f}x{rouge}")
+    print(f"ROUGE is measured against the {reference} backend's summaries.")
+
+
+def main(argv=None):
+    from components.summarization_backends import GenerationOptions, backend_names
+
+    parser = argparse.ArgumentParser(description="Compare summarizer backends on latency and ROUGE.")
+    parser.add_argument("--backends", nargs="+", default=["torch", "quantized", "onnx"], choices=backend_names())
+    parser.add_argument("--reference", default="torch", choices=backend_names())
+    parser.add_argument("--test-set", help="JSONL of {id, text, reference?}; default: the benchmark corpus")
+    parser.add_argument("--size", action="append", choices=["short", "medium", "long"],
+                        help="only corpus documents of this size (repeatable)")
+    parser.add_argument("--repeat", type=int, default=1, help="measured passes over the test set")
+    parser.add_argument("--max-length", type=int, default=200)
+    parser.add_argument("--beams", type=int, help="beam count for every backend (default: EXPLAINEE_SUMMARY_BEAMS)")
+    parser.add_argument("--no-early-stopping", action="store_true")
+    parser.add_argument("--output", help="also write the full results, summaries included, as JSON")
+    args = parser.parse_args(argv)
+
+    options = GenerationOptions(early_stopping=not args.no_early_stopping)
+    if args.beams:
+        options.num_beams = args.beams
+    items = load_test_set(args.test_set, args.size)
+    results = compare(args.backends, args.reference, items, options, args.max_length, args.repeat)
+    print_report(results, args.reference)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
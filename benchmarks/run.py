@@ -0,0 +1,230 @@
+"""
+Offline benchmark of the analysis pipeline over the saved corpus in benchmarks/corpus.
+
+    python -m benchmarks.run --repeat 5 --output bench_output.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json          # fail on regressions
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json     # record a new baseline
+
+Network backends are replaced by benchmarks/stubs.py; spaCy, the summarizer and langdetect are the real ones.
+Caches are cleared before every measured call unless --warm is given.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+
+from benchmarks import stubs
+
+STAGES = ("fetch", "language", "summarize", "ner", "glossary", "locations", "full")
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize_timings(samples):
+    ms = [s * 1000 for s in samples]
+    return {
+        "n": len(ms),
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p90_ms": round(percentile(ms, 90), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+    }
+
+
+class Bench:
+    """Runs each stage over the corpus and keeps the timings per stage and per document."""
+
+    def __init__(self, warm=False):
+        # imported here so that the stubs are already in sys.modules
+        from components import extractor, explainer, model_registry
+        from components.translation import translator
+        from services.article_processor import fetch_article
+        from services.language_service import handle_language_pipeline
+        from services.summary_generator import summarize_article
+        from services.glossary_builder import build_glossary
+        from services.location_extractor import extract_locations
+
+        self.extractor = extractor
+        self.explainer = explainer
+        self.translator = translator
+        self.model_registry = model_registry
+        self.fetch_article = fetch_article
+        self.handle_language_pipeline = handle_language_pipeline
+        self.summarize_article = summarize_article
+        self.build_glossary = build_glossary
+        self.extract_locations = extract_locations
+        self.warm = warm
+        self.samples = {stage: [] for stage in STAGES}
+        self.by_doc = {}
+        self.peak_rss = {}
+
+    def reset_caches(self):
+        if self.warm:
+            return
+        self.extractor.clear_analysis_cache()
+        self.translator.translation_memory.clear()
+        self.translator.clear_detection_cache()
+        self.explainer.get_cache().clear()
+
+    def timed(self, stage, doc_name, func, *args):
+        self.reset_caches()
+        start = time.perf_counter()
+        value = func(*args)
+        elapsed = time.perf_counter() - start
+        self.samples[stage].append(elapsed)
+        self.by_doc.setdefault(doc_name, {}).setdefault(stage, []).append(elapsed)
+        return value
+
+    def full_pipeline(self, url):
+        title, text = self.fetch_article(url)
+        context = self.handle_language_pipeline(text, title=title, url=url)
+        self.summarize_article(context)
+        self.build_glossary(context, max_entities=15)
+        self.extract_locations(context)
+        return context
+
+    def run_doc(self, entry):
+        url = stubs.corpus_url(entry)
+        name = entry["name"]
+        title, text = self.timed("fetch", name, self.fetch_article, url)
+        context = self.timed("language", name, self.handle_language_pipeline, text, title, None, url)
+        self.timed("summarize", name, self.summarize_article, context)
+        analysis = self.timed("ner", name, self.extractor.ArticleAnalysis, context.translated_text)
+        context.artifacts["analysis"] = analysis
+        self.timed("glossary", name, self.build_glossary, context, 15)
+        self.timed("locations", name, self.extract_locations, context)
+        self.timed("full", name, self.full_pipeline, url)
+        return len(text)
+
+
+def run(args):
+    stubs.install(latency=args.network_latency_ms / 1000)
+    bench = Bench(warm=args.warm)
+
+    manifest = [e for e in stubs.corpus_manifest()
+                if (not args.lang or e["lang"] in args.lang) and (not args.size or e["size"] in args.size)]
+
+    load_start = time.perf_counter()
+    bench.model_registry.warm_up(background=False)
+    model_load_s = time.perf_counter() - load_start
+
+    # one untimed pass so lazy initialisation is not measured
+    for entry in manifest:
+        bench.full_pipeline(stubs.corpus_url(entry))
+
+    chars = 0
+    full_start = time.perf_counter()
+    for _ in range(args.repeat):
+        for entry in manifest:
+            chars += bench.run_doc(entry)
+            bench.peak_rss[entry["name"]] = round(peak_rss_mb(), 1)
+    elapsed = time.perf_counter() - full_start
+
+    full_total = sum(bench.samples["full"])
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "warm_caches": args.warm,
+            "network_latency_ms": args.network_latency_ms,
+            "documents": [e["name"] for e in manifest],
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "model_load_s": round(model_load_s, 3),
+        "stages": {stage: summarize_timings(samples) for stage, samples in bench.samples.items()},
+        "documents": {
+            name: {stage: summarize_timings(samples) for stage, samples in stages.items()}
+            for name, stages in bench.by_doc.items()
+        },
+        "throughput": {
+            "articles_per_s": round(len(bench.samples["full"]) / full_total, 3) if full_total else 0.0,
+            "chars_per_s": round(chars / elapsed, 1) if elapsed else 0.0,
+        },
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "peak_rss_mb_by_document": bench.peak_rss,
+    }
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """Returns a list of (stage, baseline_p50, current_p50) for stages slower than the baseline allows."""
+    regressions = []
+    for stage, current in results["stages"].items():
+        reference = baseline.get("stages", {}).get(stage)
+        if not reference:
+            continue
+        allowed = reference["p50_ms"] * (1 + tolerance)
+        if current["p50_ms"] > allowed and current["p50_ms"] - reference["p50_ms"] > min_delta_ms:
+            regressions.append((stage, reference["p50_ms"], current["p50_ms"]))
+    return regressions
+
+
+def print_report(results):
+    print(f"{'stage':<12}{'p50 ms':>12}{'p90 ms':>12}{'p99 ms':>12}{'mean ms':>12}")
+    for stage, s in results["stages"].items():
+        print(f"{stage:<12}{s['p50_ms']:>12.1f}{s['p90_ms']:>12.1f}{s['p99_ms']:>12.1f}{s['mean_ms']:>12.1f}")
+    print(f"throughput: {results['throughput']['articles_per_s']:.2f} articles/s, "
+          f"{results['throughput']['chars_per_s']:.0f} chars/s")
+    print(f"model load: {results['model_load_s']:.1f}s, peak RSS: {results['peak_rss_mb']:.0f} MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Explainee pipeline offline.")
+    parser.add_argument("--repeat", type=int, default=3, help="measured passes over the corpus")
+    parser.add_argument("--lang", action="append", help="only documents in this language (repeatable)")
+    parser.add_argument("--size", action="append", choices=["short", "medium", "long"],
+                        help="only documents of this size (repeatable)")
+    parser.add_argument("--warm", action="store_true", help="keep caches between measured calls")
+    parser.add_argument("--network-latency-ms", type=float, default=0.0,
+                        help="simulated round trip of the stubbed network backends")
+    parser.add_argument("--output", default="bench_output.json", help="where the JSON results are written")
+    parser.add_argument("--baseline", help="baseline JSON to compare against; exits 1 on regressions")
+    parser.add_argument("--save-baseline", help="also write the results to this baseline path")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative p50 slowdown")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                        help="ignore slowdowns smaller than this many milliseconds")
+    args = parser.parse_args(argv)
+
+    # keep the benchmark's glossary/result caches away from the real ones
+    os.environ.setdefault("EXPLAINEE_CACHE_DIR", tempfile.mkdtemp(prefix="explainee-bench-"))
+
+    results = run(args)
+    print_report(results)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        for stage, before, after in regressions:
+            print(f"REGRESSION {stage}: p50 {before:.1f} ms -> {after:.1f} ms", file=sys.stderr)
+        if regressions:
+            return 1
+        print("No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
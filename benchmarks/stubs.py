@@ -0,0 +1,185 @@
+"""
+Local stand-ins for the network backends (requests, googletrans, wikipedia), so benchmark runs
+are reproducible and offline. install() must run before the services are imported.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+import types
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+BASE_URL = "http://bench.local/"
+
+# simulated round-trip time of the network backends, in seconds
+network_latency = 0.0
+
+
+def _sleep():
+    if network_latency:
+        time.sleep(network_latency)
+
+
+# --- requests ---
+
+class FakeResponse:
+    def __init__(self, url, content, status_code=200, headers=None):
+        self.url = url
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {"Content-Type": "text/html; charset=utf-8"}
+        self.encoding = "utf-8"
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise _requests_module.HTTPError(f"{self.status_code} for {self.url}")
+
+    def iter_content(self, chunk_size=65536):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _serve(url, **kwargs):
+    _sleep()
+    if not url.startswith(BASE_URL):
+        return FakeResponse(url, b"", status_code=404)
+    path = os.path.join(CORPUS_DIR, url[len(BASE_URL):])
+    if not os.path.isfile(path):
+        return FakeResponse(url, b"", status_code=404)
+    with open(path, "rb") as f:
+        return FakeResponse(url, f.read())
+
+
+class FakeSession:
+    def __init__(self):
+        self.headers = {}
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def get(self, url, **kwargs):
+        return _serve(url, **kwargs)
+
+    def close(self):
+        pass
+
+
+def _build_requests():
+    module = types.ModuleType("requests")
+    module.RequestException = type("RequestException", (IOError,), {})
+    module.HTTPError = type("HTTPError", (module.RequestException,), {})
+    module.get = _serve
+    module.Session = FakeSession
+    module.Response = FakeResponse
+    adapters = types.ModuleType("requests.adapters")
+    adapters.HTTPAdapter = lambda *args, **kwargs: None
+    module.adapters = adapters
+    exceptions = types.ModuleType("requests.exceptions")
+    exceptions.RequestException = module.RequestException
+    exceptions.HTTPError = module.HTTPError
+    module.exceptions = exceptions
+    return module
+
+
+_requests_module = _build_requests()
+
+
+# --- wikipedia ---
+
+def _build_wikipedia():
+    module = types.ModuleType("wikipedia")
+
+    class DisambiguationError(Exception):
+        pass
+
+    class PageError(Exception):
+        pass
+
+    def summary(term, sentences=2):
+        _sleep()
+        digest = int(hashlib.sha1(term.encode("utf-8")).hexdigest(), 16)
+        # a deterministic share of terms behave like ambiguous or missing pages
+        if digest % 7 == 0:
+            raise DisambiguationError(term)
+        if digest % 11 == 0:
+            raise PageError(term)
+        return f"{term} is a subject covered by the benchmark stub. It has no real Wikipedia page."
+
+    module.DisambiguationError = DisambiguationError
+    module.PageError = PageError
+    module.summary = summary
+    return module
+
+
+# --- googletrans ---
+
+def _load_translations():
+    with open(os.path.join(CORPUS_DIR, "translations.json"), encoding="utf-8") as f:
+        table = json.load(f)
+    merged = {}
+    for mapping in table.values():
+        merged.update(mapping)
+    return merged
+
+
+_translations = None
+
+
+def fake_translate(text, src, dest):
+    """Returns the corpus' English version of a paragraph (or the text itself for anything else)."""
+    global _translations
+    if _translations is None:
+        _translations = _load_translations()
+    _sleep()
+    if dest == "en":
+        return _translations.get(text, text)
+    return text
+
+
+def _build_googletrans():
+    module = types.ModuleType("googletrans")
+
+    class Translator:
+        def translate(self, text, src="auto", dest="en"):
+            result = types.SimpleNamespace()
+            result.text = fake_translate(text, src, dest)
+            result.src, result.dest = src, dest
+            return result
+
+    module.Translator = Translator
+    return module
+
+
+def install(latency=0.0):
+    """Replaces the network-facing modules in sys.modules with the local stand-ins."""
+    global network_latency
+    network_latency = latency
+    sys.modules["requests"] = _requests_module
+    sys.modules["requests.adapters"] = _requests_module.adapters
+    sys.modules["requests.exceptions"] = _requests_module.exceptions
+    sys.modules["wikipedia"] = _build_wikipedia()
+    sys.modules["googletrans"] = _build_googletrans()
+
+
+def corpus_manifest():
+    with open(os.path.join(CORPUS_DIR, "manifest.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def corpus_url(entry):
+    return BASE_URL + entry["file"]
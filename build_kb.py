@@ -0,0 +1,45 @@
+"""
+Builds the offline knowledge base that the glossary reads before asking live Wikipedia.
+
+    python build_kb.py enwiki-latest-abstract.xml.gz
+    python build_kb.py people.tsv orgs.jsonl -o /srv/explainee/kb
+    python build_kb.py data/kb_sample.jsonl --lookup ISRO
+    python build_kb.py --lookup ISRO   # look up in an existing knowledge base without rebuilding
+
+Sources are Wikipedia abstract dumps (*.xml[.gz]), JSONL ({"title", "summary", "aliases"?}) or TSV
+(title<TAB>summary[<TAB>alias|alias]). The output directory defaults to EXPLAINEE_KB (CACHE_DIR/kb),
+where the app picks it up.
+"""
+
+import argparse
+import time
+
+from components.knowledge_base import KnowledgeBase, build
+from components.settings import KB_PATH
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the offline glossary knowledge base.")
+    parser.add_argument("sources", nargs="*",
+                        help="abstract dumps, JSONL or TSV files (optionally .gz); may be omitted with --lookup")
+    parser.add_argument("-o", "--output", default=KB_PATH, help="knowledge base directory")
+    parser.add_argument("--sentences", type=int, default=2, help="sentences kept per summary")
+    parser.add_argument("--lookup", action="append", default=[], help="look a term up after building (repeatable)")
+    args = parser.parse_args(argv)
+    if not args.sources and not args.lookup:
+        parser.error("give at least one source to build from, or --lookup to query an existing knowledge base")
+
+    if args.sources:
+        start = time.perf_counter()
+        count = build(args.sources, args.output, args.sentences)
+        print(f"Built {args.output}: {count} titles and aliases in {time.perf_counter() - start:.1f}s")
+
+    if args.lookup:
+        kb = KnowledgeBase(args.output)
+        for term in args.lookup:
+            print(f"{term}: {kb.lookup(term)}")
+        kb.close()
+
+
+if __name__ == "__main__":
+    main()
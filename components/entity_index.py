@@ -0,0 +1,136 @@
+import re
+from collections import Counter
+
+from components.explainer import is_trivial
+
+GLOSSARY_LABELS = ("PERSON", "ORG")
+# how much an early mention adds on top of the mention itself (first character: +1, last: +0)
+POSITION_WEIGHT = 1.0
+
+_LEADING_ARTICLE = re.compile(r"^(the|a|an)\s+", re.IGNORECASE)
+_POSSESSIVE = re.compile(r"['’]s?$")
+_EDGE_PUNCT = re.compile(r"^[\W_]+|[\W_]+$")
+# words skipped when matching an acronym against a full name ("Bank of England" -> "BoE"/"BE")
+_ACRONYM_STOPWORDS = {"of", "the", "and", "for", "&", "de", "la", "du", "der", "und"}
+
+
+def clean_surface(text):
+    """Normalizes an entity mention: whitespace, leading article, possessive and edge punctuation."""
+    text = " ".join(text.split())
+    text = _LEADING_ARTICLE.sub("", text)
+    text = _POSSESSIVE.sub("", text)
+    return _EDGE_PUNCT.sub("", text)
+
+
+def _acronym_of(tokens):
+    return "".join(t[0] for t in tokens if t.lower() not in _ACRONYM_STOPWORDS and t[:1].isalpha()).upper()
+
+
+class CanonicalEntity:
+    def __init__(self, key, label):
+        self.key = key
+        self.label = label
+        self.surfaces = Counter()
+        self.mentions = 0
+        self.first_position = 1.0
+        self.score = 0.0
+
+    @property
+    def tokens(self):
+        return self.key.split()
+
+    @property
+    def name(self):
+        """The longest surface form, in its most frequent spelling."""
+        return max(self.surfaces.items(), key=lambda item: (len(item[0].split()), item[1], item[0]))[0]
+
+    @property
+    def aliases(self):
+        return sorted(s for s in self.surfaces if s != self.name)
+
+    def add(self, surface, position):
+        self.surfaces[surface] += 1
+        self.mentions += 1
+        self.first_position = min(self.first_position, position)
+        self.score += 1 + POSITION_WEIGHT * (1 - position)
+
+    def absorb(self, other):
+        self.surfaces.update(other.surfaces)
+        self.mentions += other.mentions
+        self.first_position = min(self.first_position, other.first_position)
+        self.score += other.score
+
+    def __repr__(self):
+        return f"CanonicalEntity({self.name!r}, {self.label}, mentions={self.mentions}, score={self.score:.2f})"
+
+
+class EntityIndex:
+    """
+    Canonical entities of one article, built from the spaCy entity spans. Mentions are cleaned,
+    trivial ones (explainer.is_trivial) dropped, surface variants of the same name grouped, and
+    short forms merged into the full name they belong to: "Modi" into "Narendra Modi", "BJP" into
+    "Bharatiya Janata Party". Entities are ranked by mention count weighted by how early they appear.
+    """
+
+    def __init__(self, spans, text_length, labels=GLOSSARY_LABELS):
+        self.labels = tuple(labels)
+        text_length = max(text_length, 1)
+        groups = {}
+        label_votes = {}
+        for span in spans:
+            if span.label_ not in self.labels:
+                continue
+            surface = clean_surface(span.text)
+            if not surface or is_trivial(surface):
+                continue
+            key = surface.casefold()
+            entity = groups.get(key)
+            if entity is None:
+                entity = groups[key] = CanonicalEntity(key, span.label_)
+                label_votes[key] = Counter()
+            entity.add(surface, span.start_char / text_length)
+            label_votes[key][span.label_] += 1
+        for key, votes in label_votes.items():
+            groups[key].label = votes.most_common(1)[0][0]
+
+        self.entities = self._merge_aliases(list(groups.values()))
+
+    @classmethod
+    def from_analysis(cls, analysis, labels=GLOSSARY_LABELS):
+        return cls(analysis.entity_spans(labels), len(analysis.text), labels)
+
+    @staticmethod
+    def _alias_targets(short, candidates):
+        tokens = short.tokens
+        n = len(tokens)
+        targets = []
+        for full in candidates:
+            full_tokens = full.tokens
+            if len(full_tokens) <= n:
+                continue
+            if any(full_tokens[i:i + n] == tokens for i in range(len(full_tokens) - n + 1)):
+                targets.append(full)
+            elif n == 1 and short.label == "ORG" and len(short.key) >= 2 and short.key.upper() == _acronym_of(full_tokens):
+                targets.append(full)
+        return targets
+
+    def _merge_aliases(self, entities):
+        # shortest first, so "Modi" -> "Narendra Modi" happens before "Narendra Modi" is considered
+        merged = []
+        remaining = sorted(entities, key=lambda e: len(e.tokens))
+        for i, entity in enumerate(remaining):
+            candidates = [e for e in remaining[i + 1:] if e.label == entity.label]
+            targets = self._alias_targets(entity, candidates)
+            if targets:
+                # an ambiguous short form ("Smith" with two Smiths) goes to the most prominent one
+                max(targets, key=lambda e: (e.score, -e.first_position)).absorb(entity)
+            else:
+                merged.append(entity)
+        return merged
+
+    def ranked(self, label=None):
+        entities = [e for e in self.entities if label is None or e.label == label]
+        return sorted(entities, key=lambda e: (-e.score, e.first_position, e.name))
+
+    def top(self, k, label=None):
+        return self.ranked(label)[:k]
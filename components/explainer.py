@@ -1,5 +1,26 @@
 import wikipedia
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from components import metrics
+from components.glossary_cache import GlossaryCache
+from components.knowledge_base import get_knowledge_base
+from components.settings import WIKIPEDIA_FALLBACK
+
+# bounded pool for resolving cache misses against Wikipedia
+LOOKUP_WORKERS = 6
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = GlossaryCache()
+        return _cache
 
 def is_trivial(term):
     if re.fullmatch(r"\d+([a-zA-Z]*)?", term):
@@ -14,14 +35,76 @@ def is_trivial(term):
         return True
     return False
 
-def get_glossary_definitions(persons, orgs):
-    glossary = {}
-    for term in persons + orgs:
-        if is_trivial(term):
-            continue
+def fetch_definition(term):
+    """
+    Looks the term up on Wikipedia. Returns (summary, cacheable): ambiguous or missing pages
+    give (None, True) so they are negatively cached, transient errors give (None, False).
+    """
+    try:
+        with metrics.timed("wikipedia.lookup"):
+            return wikipedia.summary(term, sentences=2), True
+    except (wikipedia.DisambiguationError, wikipedia.PageError):
+        metrics.incr("wikipedia.miss")
+        return None, True
+    except Exception:
+        metrics.incr("wikipedia.error")
+        return None, False
+
+def lookup_glossary(persons, orgs, cache=None, max_workers=LOOKUP_WORKERS, deadline=None):
+    """
+    Definitions for the terms, from the offline knowledge base first, then the cache, and live
+    Wikipedia for the rest (unless WIKIPEDIA_FALLBACK is off). Lookups still running at
+    `deadline` (a time.monotonic() value, None for no limit) are skipped.
+    Returns (glossary, skipped terms).
+    """
+    terms = list(dict.fromkeys(t for t in persons + orgs if not is_trivial(t)))
+    if not terms:
+        return {}, []
+
+    known = {}
+    kb = get_knowledge_base()
+    if kb is not None:
+        for t in terms:
+            summary = kb.lookup(t)
+            if summary:
+                known[t] = summary
+        metrics.incr("glossary.kb_hit", len(known))
+    rest = [t for t in terms if t not in known]
+
+    cache = cache or get_cache()
+    if rest:
+        try:
+            known.update(cache.get_many(rest))
+        except Exception:
+            pass  # a broken cache must not break the glossary
+
+    misses = [t for t in rest if t not in known]
+    metrics.incr("glossary.cache_hit", len(rest) - len(misses))
+    metrics.incr("glossary.cache_miss", len(misses))
+    if not WIKIPEDIA_FALLBACK:
+        misses = []
+    skipped = []
+    if misses and deadline is not None and time.monotonic() >= deadline:
+        skipped, misses = misses, []
+    if misses:
+        pool = ThreadPoolExecutor(max_workers=min(max_workers, len(misses)))
+        futures = {pool.submit(metrics.run_in_context(fetch_definition), t): t for t in misses}
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        done, not_done = wait(futures, timeout=timeout)
+        pool.shutdown(wait=False, cancel_futures=True)
+        results = {futures[f]: f.result() for f in done}
+        skipped = [futures[f] for f in not_done]
+        fetched = {t: summary for t, (summary, cacheable) in results.items() if cacheable}
         try:
-            summary = wikipedia.summary(term, sentences=2)
-            glossary[term] = summary  # ✅ Only include when a valid summary is returned
-        except (wikipedia.DisambiguationError, wikipedia.PageError, Exception):
-            continue  # ❌ Skip ambiguous or missing or error terms
-    return glossary
+            cache.put_many(fetched)
+        except Exception:
+            pass
+        known.update({t: summary for t, (summary, _) in results.items()})
+    if skipped:
+        metrics.incr("glossary.skipped_deadline", len(skipped))
+
+    # ✅ Only include terms with a valid summary, in the original order
+    return {t: known[t] for t in terms if known.get(t)}, skipped
+
+def get_glossary_definitions(persons, orgs, cache=None, max_workers=LOOKUP_WORKERS):
+    return lookup_glossary(persons, orgs, cache, max_workers)[0]
@@ -1,26 +1,233 @@
-import spacy
-from collections import defaultdict, Counter
+import hashlib
+import threading
+from collections import defaultdict, Counter, OrderedDict
 
-# Load spaCy model
-nlp = spacy.load("en_core_web_sm")
+from components import metrics, model_registry
+from components.settings import SPACY_BATCH_SIZE, SPACY_MODEL, SPACY_PROCESSES, SPACY_SHARD_CHARS
 
-def extract_named_entities(text):
-    doc = nlp(text)
-    categorized_ents = defaultdict(set)
 
-    for ent in doc.ents:
-        categorized_ents[ent.label_].add(ent.text.strip())
+def _load_nlp():
+    import spacy
+    return spacy.load(SPACY_MODEL)
 
-    # Convert sets to sorted lists
-    return {label: sorted(list(entities)) for label, entities in categorized_ents.items()}
 
-def extract_keywords(text, top_n=10):
-    doc = nlp(text.lower())
-    words = [
-        token.lemma_ for token in doc
-        if token.pos_ in ["NOUN", "PROPN", "ADJ"]
+# spaCy model is loaded on first use (or by the registry's warm-up)
+model_registry.register("spacy", _load_nlp)
+
+
+def get_nlp():
+    return model_registry.get("spacy")
+
+
+# pipeline components each task can do without (components a model lacks are ignored); a Doc parsed
+# with a pruned profile misses their annotations: "entities" has no sentences, POS tags or lemmas,
+# "keywords" no entities or sentences
+PIPELINE_PROFILES = {
+    "full": frozenset(),
+    "entities": frozenset({"tagger", "morphologizer", "attribute_ruler", "lemmatizer", "parser", "senter"}),
+    "keywords": frozenset({"ner", "parser", "senter"}),
+}
+# extra worker processes only pay off with at least this many shards each
+MIN_SHARDS_PER_PROCESS = 4
+
+
+def shard_text(text, max_chars=SPACY_SHARD_CHARS):
+    """
+    Splits the text into consecutive pieces of at most max_chars characters, cut after a paragraph
+    break where possible (else a line break, else a space). The pieces join back into the text.
+    """
+    shards, start = [], 0
+    while len(text) - start > max_chars:
+        end = start + max_chars
+        for separator in ("\n\n", "\n", " "):
+            cut = text.rfind(separator, start + 1, end)
+            if cut > start:
+                end = cut + len(separator)
+                break
+        shards.append(text[start:end])
+        start = end
+    if start < len(text):
+        shards.append(text[start:])
+    return shards
+
+
+def parse_texts(texts, profile="full", batch_size=SPACY_BATCH_SIZE, n_process=SPACY_PROCESSES):
+    """
+    Parses the texts with only the profile's components and returns one Doc per text.
+    The shards of all texts go through a single nlp.pipe, so a long article is spread over batches
+    and worker processes like many short ones, and no parse is larger than a shard. The shard Docs
+    of each text are merged back into one Doc whose offsets (entities included) refer to the text.
+    """
+    from spacy.tokens import Doc
+
+    nlp = get_nlp()
+    disable = [name for name in nlp.pipe_names if name in PIPELINE_PROFILES[profile]]
+    sharded = [shard_text(text, min(SPACY_SHARD_CHARS, nlp.max_length)) for text in texts]
+    shards = [shard for pieces in sharded for shard in pieces]
+    metrics.observe("spacy.shards", len(shards))
+    n_process = max(1, min(n_process, len(shards) // MIN_SHARDS_PER_PROCESS))
+    shard_docs = iter(nlp.pipe(shards, batch_size=batch_size, n_process=n_process, disable=disable))
+
+    docs = []
+    for text, pieces in zip(texts, sharded):
+        parts = [next(shard_docs) for _ in pieces]
+        if not parts:
+            docs.append(nlp.make_doc(text))
+        elif len(parts) == 1:
+            docs.append(parts[0])
+        else:
+            docs.append(Doc.from_docs(parts, ensure_whitespace=False))
+    return docs
+
+
+KEYWORD_POS = {"NOUN", "PROPN", "ADJ"}
+
+
+def keyword_lemmas(tokens):
+    """Lowercased lemmas of the keyword tokens in a Doc or Span."""
+    return [
+        token.lemma_.lower() for token in tokens
+        if token.pos_ in KEYWORD_POS
         and not token.is_stop
         and not token.is_punct
     ]
-    most_common = Counter(words).most_common(top_n)
-    return [word for word, _ in most_common]
+
+
+# number of recent parses kept so that every stage working on the same text shares one Doc
+ANALYSIS_CACHE_SIZE = 8
+
+_analysis_cache = OrderedDict()
+_analysis_lock = threading.Lock()
+
+
+class ArticleAnalysis:
+    """
+    Parses a text once with spaCy and exposes entities, keywords and sentences from that single Doc.
+    `profile` names the PIPELINE_PROFILES entry it was parsed with; only "full" provides all three.
+    """
+
+    def __init__(self, text, doc=None, profile="full"):
+        self.text = text
+        self.profile = profile
+        if doc is None:
+            metrics.observe("spacy.input_chars", len(text))
+            with metrics.timed("spacy.parse"):
+                doc = parse_texts([text], profile)[0]
+        self.doc = doc
+        self._entities = None
+        self._keyword_counts = None
+
+    @property
+    def entities(self):
+        """Entities grouped by label, as sorted lists of unique surface strings."""
+        if self._entities is None:
+            categorized_ents = defaultdict(set)
+            for ent in self.doc.ents:
+                categorized_ents[ent.label_].add(ent.text.strip())
+            self._entities = {label: sorted(entities) for label, entities in categorized_ents.items()}
+        return self._entities
+
+    def entities_by_label(self, label):
+        return self.entities.get(label, [])
+
+    def entity_spans(self, labels=None):
+        """Entity spans from the Doc, optionally restricted to the given labels."""
+        return [ent for ent in self.doc.ents if labels is None or ent.label_ in labels]
+
+    def keyword_counts(self):
+        """Counter of keyword lemmas (nouns, proper nouns, adjectives) over the whole text."""
+        if self._keyword_counts is None:
+            self._keyword_counts = Counter(keyword_lemmas(self.doc))
+        return self._keyword_counts
+
+    def keywords(self, top_n=10):
+        most_common = self.keyword_counts().most_common(top_n)
+        return [word for word, _ in most_common]
+
+    @property
+    def sentences(self):
+        return list(self.doc.sents)
+
+
+def _text_key(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _lookup(key, profile):
+    # called with _analysis_lock held; a full parse also serves the pruned profiles
+    candidates = [(profile, key)] if profile == "full" else [(profile, key), ("full", key)]
+    for candidate in candidates:
+        analysis = _analysis_cache.get(candidate)
+        if analysis is not None:
+            _analysis_cache.move_to_end(candidate)
+            return analysis
+    return None
+
+
+def _remember(analyses):
+    # called with _analysis_lock held
+    for analysis in analyses:
+        _analysis_cache[(analysis.profile, _text_key(analysis.text))] = analysis
+    while len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+        _analysis_cache.popitem(last=False)
+
+
+def cached_analysis(text, profile="full"):
+    """Returns a cached ArticleAnalysis of the text that covers the profile, or None."""
+    with _analysis_lock:
+        analysis = _lookup(_text_key(text), profile)
+    if analysis is not None:
+        metrics.incr("analysis.cache_hit")
+    return analysis
+
+
+def remember_analysis(analysis):
+    """Adds an analysis (e.g. one parsed by the model server) to the cache."""
+    with _analysis_lock:
+        _remember([analysis])
+
+
+def analyze_text(text, profile="full"):
+    """
+    Returns the ArticleAnalysis for the text, reusing a recent parse of the same text when there is one.
+    """
+    analysis = cached_analysis(text, profile)
+    if analysis is None:
+        analysis = ArticleAnalysis(text, profile=profile)
+        remember_analysis(analysis)
+    return analysis
+
+
+def analyze_texts(texts, batch_size=SPACY_BATCH_SIZE, profile="full", n_process=SPACY_PROCESSES):
+    """
+    Analyses many texts with nlp.pipe (see parse_texts), reusing cached parses, and returns one
+    ArticleAnalysis per text.
+    """
+    keys = [_text_key(text) for text in texts]
+    with _analysis_lock:
+        analyses = [_lookup(key, profile) for key in keys]
+
+    todo = [i for i, analysis in enumerate(analyses) if analysis is None]
+    metrics.incr("analysis.cache_hit", len(texts) - len(todo))
+    if todo:
+        metrics.observe("spacy.input_chars", sum(len(texts[i]) for i in todo))
+        with metrics.timed("spacy.pipe"):
+            docs = parse_texts([texts[i] for i in todo], profile, batch_size, n_process)
+        for i, doc in zip(todo, docs):
+            analyses[i] = ArticleAnalysis(texts[i], doc=doc, profile=profile)
+        with _analysis_lock:
+            _remember(analyses[i] for i in todo)
+    return analyses
+
+
+def extract_named_entities(text):
+    return analyze_text(text, "entities").entities
+
+
+def extract_keywords(text, top_n=10):
+    return analyze_text(text, "keywords").keywords(top_n)
+
+
+def clear_analysis_cache():
+    with _analysis_lock:
+        _analysis_cache.clear()
@@ -0,0 +1,104 @@
+import re
+import sqlite3
+import threading
+import time
+
+from components.settings import cache_path
+
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_NEGATIVE_TTL = 24 * 3600
+DEFAULT_MAX_ENTRIES = 20000
+
+
+def normalize_term(term):
+    return re.sub(r"\s+", " ", term).strip().casefold()
+
+
+class GlossaryCache:
+    """
+    Disk-backed (sqlite) cache of Wikipedia summaries keyed by normalized term.
+    A None summary is a negative entry for a term with no usable page; it expires after negative_ttl.
+    Entries are evicted least-recently-used first once max_entries is exceeded.
+    """
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL, negative_ttl=DEFAULT_NEGATIVE_TTL,
+                 max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path or cache_path("glossary.sqlite3")
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS glossary ("
+                " term TEXT PRIMARY KEY,"
+                " summary TEXT,"
+                " fetched_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS glossary_accessed ON glossary(accessed_at)")
+
+    def get_many(self, terms):
+        """
+        Returns {term: summary_or_None} for every term with a fresh entry; missing terms are cache misses.
+        """
+        # spellings that differ only in case or spacing share one entry, and each gets it
+        keys = {}
+        for t in terms:
+            keys.setdefault(normalize_term(t), []).append(t)
+        if not keys:
+            return {}
+        now = time.time()
+        placeholders = ",".join("?" * len(keys))
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                f"SELECT term, summary, fetched_at FROM glossary WHERE term IN ({placeholders})",
+                list(keys),
+            ).fetchall()
+            found = {}
+            for key, summary, fetched_at in rows:
+                ttl = self.ttl if summary is not None else self.negative_ttl
+                if now - fetched_at <= ttl:
+                    for term in keys[key]:
+                        found[term] = summary
+            if found:
+                self._conn.executemany(
+                    "UPDATE glossary SET accessed_at = ? WHERE term = ?",
+                    [(now, key) for key in {normalize_term(t) for t in found}],
+                )
+        return found
+
+    def get(self, term):
+        """Returns (hit, summary); summary is None for a cached miss."""
+        found = self.get_many([term])
+        return (term in found), found.get(term)
+
+    def put_many(self, items):
+        """Stores {term: summary_or_None}."""
+        if not items:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO glossary (term, summary, fetched_at, accessed_at) VALUES (?, ?, ?, ?)",
+                [(normalize_term(t), s, now, now) for t, s in items.items()],
+            )
+            self._evict()
+
+    def put(self, term, summary):
+        self.put_many({term: summary})
+
+    def _evict(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM glossary").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM glossary WHERE term IN"
+                " (SELECT term FROM glossary ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM glossary")
@@ -0,0 +1,178 @@
+import os
+import re
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = "lxml"
+except ImportError:
+    DEFAULT_PARSER = "html.parser"
+
+# containers whose paragraphs are never article text
+BOILERPLATE_TAGS = {"nav", "header", "footer", "aside", "form", "noscript", "script", "style", "template"}
+BOILERPLATE_HINTS = re.compile(
+    r"cookie|consent|gdpr|banner|newsletter|subscribe|signup|footer|masthead|navbar|\bnav\b|menu|"
+    r"sidebar|share|social|promo|advert|\bads?\b|sponsor|related|recommend|comment|breadcrumb|popup|modal",
+    re.IGNORECASE,
+)
+MAX_LINK_DENSITY = 0.5
+# paragraphs in a container scoring below this share of the best container are dropped
+MIN_CONTAINER_SHARE = 0.2
+
+
+class ExtractedArticle:
+    def __init__(self, title, paragraphs, html_bytes):
+        self.title = title
+        self.paragraphs = paragraphs
+        self.html_bytes = html_bytes
+
+    @property
+    def text(self):
+        return "\n\n".join(self.paragraphs)
+
+    @property
+    def text_bytes(self):
+        return len(self.text.encode("utf-8"))
+
+
+class ExtractionEngine:
+    """Interface for HTML-to-article engines: extract(html bytes or str) -> ExtractedArticle."""
+
+    name = None
+
+    def extract(self, html):
+        raise NotImplementedError
+
+
+def _html_size(html):
+    return len(html) if isinstance(html, bytes) else len(html.encode("utf-8"))
+
+
+def _text_and_link_chars(p):
+    """One walk over the paragraph's text nodes: its stripped text and how many characters sit inside links."""
+    parts = []
+    link_chars = 0
+    for piece in p.strings:
+        parts.append(piece)
+        node = piece.parent
+        while node is not None and node is not p:
+            if node.name == "a":
+                link_chars += len(piece)
+                break
+            node = node.parent
+    return "".join(parts).strip(), link_chars
+
+
+def _title_of(soup):
+    return soup.title.string.strip() if soup.title and soup.title.string else "No title found"
+
+
+class ParagraphEngine(ExtractionEngine):
+    """The original behaviour: every non-empty <p>, boilerplate included."""
+
+    name = "paragraphs"
+
+    def __init__(self, parser=None):
+        self.parser = parser or DEFAULT_PARSER
+
+    def extract(self, html):
+        soup = BeautifulSoup(html, self.parser)
+        paragraphs = []
+        for p in soup.find_all("p"):
+            text = p.get_text().strip()
+            if text:
+                paragraphs.append(text)
+        return ExtractedArticle(_title_of(soup), paragraphs, _html_size(html))
+
+
+class DensityEngine(ExtractionEngine):
+    """
+    Keeps <p> text from the densest content containers. Paragraphs under boilerplate containers
+    (nav/footer/cookie banners/...) or made mostly of links are dropped. Each ancestor's verdict is
+    computed once, so the page is walked a single time.
+    """
+
+    name = "density"
+
+    def __init__(self, parser=None, max_link_density=MAX_LINK_DENSITY, min_container_share=MIN_CONTAINER_SHARE):
+        self.parser = parser or DEFAULT_PARSER
+        self.max_link_density = max_link_density
+        self.min_container_share = min_container_share
+
+    @staticmethod
+    def _looks_like_boilerplate(tag):
+        if tag.name in BOILERPLATE_TAGS:
+            return True
+        hints = " ".join(tag.get("class") or []) + " " + (tag.get("id") or "") + " " + (tag.get("role") or "")
+        return bool(hints.strip()) and bool(BOILERPLATE_HINTS.search(hints))
+
+    def _is_boilerplate(self, tag, verdicts):
+        chain = []
+        node = tag
+        verdict = False
+        while node is not None and node.name not in ("body", "html", "[document]"):
+            known = verdicts.get(id(node))
+            if known is not None:
+                verdict = known
+                break
+            chain.append(node)
+            node = node.parent
+        # an article/main element overrides generic hints further up (e.g. a "content-with-sidebar" wrapper)
+        for node in reversed(chain):
+            if node.name in ("article", "main"):
+                verdict = False
+            verdict = verdict or self._looks_like_boilerplate(node)
+            verdicts[id(node)] = verdict
+        return verdict
+
+    def extract(self, html):
+        soup = BeautifulSoup(html, self.parser)
+        verdicts = {}
+        candidates = []   # (paragraph text, container)
+        container_scores = {}
+
+        for p in soup.find_all("p"):
+            text, link_chars = _text_and_link_chars(p)
+            if not text or self._is_boilerplate(p, verdicts):
+                continue
+            if link_chars / len(text) > self.max_link_density:
+                continue
+            container = p.parent
+            candidates.append((text, container))
+            # longer paragraphs with sentence punctuation count most towards their container
+            score = len(text) + 50 * len(re.findall(r"[.!?।。,،]", text))
+            container_scores[id(container)] = container_scores.get(id(container), 0) + score
+
+        if not candidates:
+            return ExtractedArticle(_title_of(soup), [], _html_size(html))
+
+        threshold = max(container_scores.values()) * self.min_container_share
+        paragraphs = [text for text, container in candidates if container_scores[id(container)] >= threshold]
+        return ExtractedArticle(_title_of(soup), paragraphs, _html_size(html))
+
+
+_engines = {
+    DensityEngine.name: DensityEngine,
+    ParagraphEngine.name: ParagraphEngine,
+}
+_default_engine = None
+
+
+def register_engine(name, factory):
+    """Adds an extraction engine; `factory` is called without arguments to build it."""
+    _engines[name] = factory
+
+
+def get_engine(name=None):
+    """Returns the named engine, or the default one (EXPLAINEE_EXTRACTOR, "density" if unset)."""
+    global _default_engine
+    if name is None:
+        if _default_engine is None:
+            _default_engine = _engines[os.environ.get("EXPLAINEE_EXTRACTOR", DensityEngine.name)]()
+        return _default_engine
+    return _engines[name]()
+
+
+def extract(html, engine=None):
+    return (engine or get_engine()).extract(html)
@@ -0,0 +1,210 @@
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from components.glossary_cache import normalize_term
+from components.settings import KB_PATH
+
+KB_FORMAT_VERSION = 1
+SUMMARY_SENTENCES = 2
+
+# one entry per title or alias, sorted by key hash; keys and summaries live in strings.bin
+ENTRY_DTYPE = np.dtype([("key_off", "<u8"), ("key_len", "<u4"), ("val_off", "<u8"), ("val_len", "<u4")])
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+# abstracts of disambiguation pages are useless as definitions (live lookups treat them as misses)
+_DISAMBIGUATION = re.compile(r"\bmay (?:also )?refer to\b|\bcan refer to\b", re.IGNORECASE)
+
+
+def key_hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def first_sentences(text, count=SUMMARY_SENTENCES):
+    return " ".join(_SENTENCE_END.split(" ".join(text.split()), maxsplit=count)[:count])
+
+
+def _open(path):
+    return gzip.open(path, "rt", encoding="utf-8") if path.endswith(".gz") else open(path, "r", encoding="utf-8")
+
+
+def read_tsv(path):
+    """title<TAB>summary[<TAB>alias|alias...] lines; lines starting with # are skipped."""
+    with _open(path) as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) >= 2:
+                yield fields[0], fields[1], [a for a in (fields[2].split("|") if len(fields) > 2 else []) if a]
+
+
+def read_jsonl(path):
+    """{"title", "summary" (or "abstract"/"text"), "aliases"?} objects, one per line."""
+    with _open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            summary = record.get("summary") or record.get("abstract") or record.get("text") or ""
+            yield record["title"], summary, record.get("aliases") or []
+
+
+def read_wikipedia_abstracts(path):
+    """Wikipedia abstracts dump (enwiki-*-abstract.xml[.gz]): <doc><title>Wikipedia: X</title><abstract>..."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        for _, element in ET.iterparse(f, events=("end",)):
+            if element.tag != "doc":
+                continue
+            title = (element.findtext("title") or "").removeprefix("Wikipedia: ").strip()
+            abstract = element.findtext("abstract") or ""
+            element.clear()
+            if title:
+                yield title, abstract, []
+
+
+def read_source(path):
+    if ".xml" in os.path.basename(path):
+        return read_wikipedia_abstracts(path)
+    if ".jsonl" in os.path.basename(path) or ".json" in os.path.basename(path):
+        return read_jsonl(path)
+    return read_tsv(path)
+
+
+def build(sources, out_dir, sentences=SUMMARY_SENTENCES):
+    """
+    Builds a knowledge base directory from TSV / JSONL / Wikipedia abstract dump files.
+    Titles take precedence over aliases, and earlier sources over later ones. Returns the entry count.
+    Every file is written under a temporary name and renamed into place, meta.json last, so a rebuild
+    never changes the pages of a knowledge base that is already memory-mapped.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    def tmp(name):
+        return os.path.join(out_dir, name + ".tmp")
+
+    strings_tmp = tmp("strings.bin")
+    entries = {}  # key -> (is_alias, key_off, key_len, val_off, val_len)
+    offset = 0
+    skipped = 0
+
+    with open(strings_tmp, "wb") as strings:
+        def write(text):
+            nonlocal offset
+            data = text.encode("utf-8")
+            strings.write(data)
+            start, offset = offset, offset + len(data)
+            return start, len(data)
+
+        def add_key(key, is_alias, value):
+            existing = entries.get(key)
+            if existing is not None and (existing[0] <= is_alias):
+                return
+            key_off, key_len = write(key)
+            entries[key] = (is_alias, key_off, key_len) + value
+
+        for path in sources:
+            for title, summary, aliases in read_source(path):
+                summary = first_sentences(summary, sentences)
+                if not summary or _DISAMBIGUATION.search(summary):
+                    skipped += 1
+                    continue
+                title_key = normalize_term(title)
+                if title_key in entries and not entries[title_key][0]:
+                    continue
+                value = write(summary)
+                add_key(title_key, False, value)
+                for alias in aliases:
+                    add_key(normalize_term(alias), True, value)
+
+    keys = list(entries)
+    hashes = np.array([key_hash(k) for k in keys], dtype="<u8")
+    order = np.argsort(hashes, kind="stable")
+    table = np.array([entries[k][1:] for k in keys], dtype=ENTRY_DTYPE)[order]
+
+    hashes[order].tofile(tmp("hashes.bin"))
+    table.tofile(tmp("entries.bin"))
+    with open(tmp("meta.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "version": KB_FORMAT_VERSION,
+            "entries": len(keys),
+            "skipped": skipped,
+            "sources": [os.path.basename(p) for p in sources],
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }, f, indent=2)
+    for name in ("strings.bin", "hashes.bin", "entries.bin", "meta.json"):
+        os.replace(tmp(name), os.path.join(out_dir, name))
+    return len(keys)
+
+
+class KnowledgeBase:
+    """
+    Read-only title/alias -> summary store built by build(). The sorted key hashes, the entry table
+    and the strings are memory-mapped, so opening is instant and a lookup is one binary search
+    plus two small reads.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != KB_FORMAT_VERSION:
+            raise ValueError(f"{path} has knowledge base format {self.meta.get('version')}, "
+                             f"expected {KB_FORMAT_VERSION}; rebuild it")
+        count = self.meta["entries"]
+        self._hashes = np.memmap(os.path.join(path, "hashes.bin"), dtype="<u8", mode="r", shape=(count,)) \
+            if count else np.empty(0, dtype="<u8")
+        self._entries = np.memmap(os.path.join(path, "entries.bin"), dtype=ENTRY_DTYPE, mode="r", shape=(count,)) \
+            if count else np.empty(0, dtype=ENTRY_DTYPE)
+        self._strings_file = open(os.path.join(path, "strings.bin"), "rb")
+        size = os.fstat(self._strings_file.fileno()).st_size
+        self._strings = mmap.mmap(self._strings_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self):
+        return self.meta["entries"]
+
+    def lookup(self, term):
+        """Returns the summary for a title or alias, or None."""
+        key = normalize_term(term)
+        h = np.uint64(key_hash(key))
+        i = int(np.searchsorted(self._hashes, h))
+        encoded = key.encode("utf-8")
+        while i < len(self._hashes) and self._hashes[i] == h:
+            key_off, key_len, val_off, val_len = self._entries[i].tolist()
+            if self._strings[key_off:key_off + key_len] == encoded:
+                return self._strings[val_off:val_off + val_len].decode("utf-8")
+            i += 1
+        return None
+
+    def __contains__(self, term):
+        return self.lookup(term) is not None
+
+    def close(self):
+        if isinstance(self._strings, mmap.mmap):
+            self._strings.close()
+        self._strings_file.close()
+
+
+_kb = None
+_kb_loaded = False
+_kb_lock = threading.Lock()
+
+
+def get_knowledge_base():
+    """The knowledge base at EXPLAINEE_KB (default CACHE_DIR/kb), or None when none has been built."""
+    global _kb, _kb_loaded
+    with _kb_lock:
+        if not _kb_loaded:
+            _kb_loaded = True
+            if KB_PATH and os.path.isfile(os.path.join(KB_PATH, "meta.json")):
+                _kb = KnowledgeBase(KB_PATH)
+        return _kb
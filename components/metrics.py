@@ -0,0 +1,307 @@
+import contextvars
+import json
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# upper bounds for input-size histograms (bytes / characters / tokens)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, float("inf"))
+
+_lock = threading.Lock()
+_counters = {}
+_timers = {}      # name -> [count, wall_sum, cpu_sum, wall_max]
+_histograms = {}  # name -> [bucket bounds, bucket counts, sum, count]
+_sinks = []
+
+# the per-request Trace; pools that should report into it submit work through run_in_context
+_current_trace = contextvars.ContextVar("explainee_trace", default=None)
+
+
+class Trace:
+    """
+    Per-article breakdown: stage timings, counters and observed sizes recorded while it is active.
+    """
+
+    def __init__(self, **labels):
+        self.labels = labels
+        self.started_at = time.time()
+        self.stages = {}  # name -> {"calls", "wall_s", "cpu_s"}, in first-seen order
+        self.counters = {}
+        self.observations = {}
+        self.wall_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add_stage(self, name, wall, cpu):
+        with self._lock:
+            stage = self.stages.setdefault(name, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0})
+            stage["calls"] += 1
+            stage["wall_s"] += wall
+            stage["cpu_s"] += cpu
+
+    def add_count(self, name, value):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_observation(self, name, value):
+        with self._lock:
+            self.observations.setdefault(name, []).append(value)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "labels": dict(self.labels),
+                "started_at": self.started_at,
+                "wall_s": round(self.wall_seconds, 4),
+                "stages": [
+                    {"stage": name, "calls": v["calls"], "wall_s": round(v["wall_s"], 4), "cpu_s": round(v["cpu_s"], 4)}
+                    for name, v in self.stages.items()
+                ],
+                "counters": dict(self.counters),
+                "observations": {k: list(v) for k, v in self.observations.items()},
+            }
+
+
+@contextmanager
+def trace(**labels):
+    """Collects a Trace for everything recorded in this context; finished traces go to the sinks."""
+    current = Trace(**labels)
+    token = _current_trace.set(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current.wall_seconds = time.perf_counter() - start
+        _current_trace.reset(token)
+        _emit(current)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def run_in_context(func):
+    """Wraps func so it runs in a copy of the caller's context (and reports into its trace) on another thread."""
+    ctx = contextvars.copy_context()
+    # a Context can only be entered by one thread at a time, so each call runs in its own copy
+    return lambda *args, **kwargs: ctx.copy().run(func, *args, **kwargs)
+
+
+@contextmanager
+def timed(name):
+    """Records wall and CPU (of the running thread) time of the block under `name`."""
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.thread_time() - cpu_start
+        with _lock:
+            timer = _timers.setdefault(name, [0, 0.0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += wall
+            timer[2] += cpu
+            timer[3] = max(timer[3], wall)
+        active = _current_trace.get()
+        if active is not None:
+            active.add_stage(name, wall, cpu)
+
+
+def incr(name, value=1):
+    if not value:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+    active = _current_trace.get()
+    if active is not None:
+        active.add_count(name, value)
+
+
+def observe(name, value, buckets=SIZE_BUCKETS):
+    """Adds a value (e.g. an input size) to the histogram `name`."""
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = [buckets, [0] * len(buckets), 0.0, 0]
+        hist[1][bisect_left(hist[0], value)] += 1
+        hist[2] += value
+        hist[3] += 1
+    active = _current_trace.get()
+    if active is not None:
+        active.add_observation(name, value)
+
+
+def snapshot():
+    """Process-wide totals as a plain dict."""
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "timers": {
+                name: {"count": t[0], "wall_s": t[1], "cpu_s": t[2], "max_wall_s": t[3]}
+                for name, t in _timers.items()
+            },
+            "histograms": {
+                name: {"buckets": list(zip(h[0], h[1])), "sum": h[2], "count": h[3]}
+                for name, h in _histograms.items()
+            },
+        }
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _timers.clear()
+        _histograms.clear()
+
+
+# --- sinks ---
+
+class LogSink:
+    """Writes one log line per finished trace."""
+
+    def __init__(self, level=logging.INFO):
+        self.level = level
+
+    def emit(self, trace_dict):
+        stages = ", ".join(f"{s['stage']}={s['wall_s']:.3f}s" for s in trace_dict["stages"])
+        logger.log(self.level, "trace %s total=%.3fs %s counters=%s",
+                   trace_dict["labels"], trace_dict["wall_s"], stages, trace_dict["counters"])
+
+
+class JsonFileSink:
+    """Appends each finished trace as a JSON line to `path`."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def emit(self, trace_dict):
+        line = json.dumps(trace_dict, ensure_ascii=False, default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def add_sink(sink):
+    with _lock:
+        _sinks.append(sink)
+
+
+def remove_sink(sink):
+    with _lock:
+        if sink in _sinks:
+            _sinks.remove(sink)
+
+
+def _emit(finished):
+    with _lock:
+        sinks = list(_sinks)
+    if not sinks:
+        return
+    trace_dict = finished.to_dict()
+    for sink in sinks:
+        try:
+            sink.emit(trace_dict)
+        except Exception as e:
+            logger.warning("Metrics sink %s failed: %s", type(sink).__name__, e)
+
+
+# --- Prometheus text exposition ---
+
+def _prom_name(name):
+    return "explainee_" + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def render_prometheus():
+    """Renders the process-wide totals in the Prometheus text format."""
+    data = snapshot()
+    lines = []
+    for name, value in sorted(data["counters"].items()):
+        metric = _prom_name(name) + "_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    for name, t in sorted(data["timers"].items()):
+        metric = _prom_name(name) + "_seconds"
+        cpu_metric = _prom_name(name) + "_cpu_seconds_total"
+        lines += [
+            f"# TYPE {metric} summary",
+            f"{metric}_count {t['count']}",
+            f"{metric}_sum {t['wall_s']:.6f}",
+            f"# TYPE {cpu_metric} counter",
+            f"{cpu_metric} {t['cpu_s']:.6f}",
+        ]
+    for name, h in sorted(data["histograms"].items()):
+        metric = _prom_name(name)
+        lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for bound, count in h["buckets"]:
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else f"{bound}"
+            lines.append(f'{metric}_bucket{{le="{le}"}} {cumulative}')
+        lines += [f"{metric}_sum {h['sum']:g}", f"{metric}_count {h['count']}"]
+    return "\n".join(lines) + "\n"
+
+
+def dump_prometheus(path):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(render_prometheus())
+    os.replace(tmp_path, path)
+
+
+class _PrometheusHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+
+
+def start_prometheus_server(port, host="127.0.0.1"):
+    """Serves /metrics on a daemon thread (once per process); returns the server."""
+    global _server
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _PrometheusHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+        return _server
+
+
+_configured = False
+
+
+def configure_from_env():
+    """
+    Sets up sinks once per process from EXPLAINEE_METRICS_LOG (any value), EXPLAINEE_METRICS_FILE (JSONL path)
+    and EXPLAINEE_METRICS_PORT (Prometheus endpoint).
+    """
+    global _configured
+    with _lock:
+        if _configured:
+            return
+        _configured = True
+    if os.environ.get("EXPLAINEE_METRICS_LOG"):
+        add_sink(LogSink())
+    if os.environ.get("EXPLAINEE_METRICS_FILE"):
+        add_sink(JsonFileSink(os.environ["EXPLAINEE_METRICS_FILE"]))
+    if os.environ.get("EXPLAINEE_METRICS_PORT"):
+        try:
+            start_prometheus_server(int(os.environ["EXPLAINEE_METRICS_PORT"]))
+        except OSError as e:
+            logger.warning("Could not start the metrics endpoint: %s", e)
@@ -0,0 +1,197 @@
+import base64
+import http.client
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+from components import metrics, model_registry
+from components.extractor import ArticleAnalysis, analyze_text, cached_analysis, remember_analysis
+from components.summarizer import generate_summary
+
+logger = logging.getLogger(__name__)
+
+# "http://127.0.0.1:8765" or "unix:///run/explainee/models.sock"; unset means models run in-process
+MODEL_SERVER = os.environ.get("EXPLAINEE_MODEL_SERVER")
+REQUEST_TIMEOUT = 300
+# the sidebar asks for the server's status on every rerun: a short timeout, and answers reused for a while
+HEALTH_TIMEOUT = 1.0
+STATUS_CACHE_SECONDS = 5
+# an overloaded server answers 503; the client waits Retry-After and tries this many more times
+BUSY_RETRIES = 5
+# after a connection failure the in-process models are used for this long before the server is tried again
+DOWN_RETRY_SECONDS = 30
+
+
+class ModelServerBusy(RuntimeError):
+    pass
+
+
+class ModelServerError(RuntimeError):
+    pass
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class ModelClient:
+    """Talks JSON over HTTP (TCP or a Unix socket) to model_server.py."""
+
+    def __init__(self, address, timeout=REQUEST_TIMEOUT, busy_retries=BUSY_RETRIES):
+        self.address = address
+        self.timeout = timeout
+        self.busy_retries = busy_retries
+        self._vocabs = {}
+
+    def _connection(self, timeout):
+        parts = urlsplit(self.address)
+        if parts.scheme == "unix":
+            return _UnixHTTPConnection(parts.path, timeout)
+        return http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+
+    def _request(self, method, path, payload=None, timeout=None):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        for attempt in range(self.busy_retries + 1):
+            conn = self._connection(timeout or self.timeout)
+            try:
+                conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+                response = conn.getresponse()
+                data = response.read()
+                retry_after = response.getheader("Retry-After")
+            finally:
+                conn.close()
+            if response.status == 503:
+                metrics.incr("model_client.busy")
+                if attempt < self.busy_retries:
+                    time.sleep(float(retry_after or 1))
+                    continue
+                raise ModelServerBusy(f"Model server at {self.address} is overloaded")
+            if response.status != 200:
+                raise ModelServerError(f"Model server returned {response.status}: {data[:200]!r}")
+            return json.loads(data)
+
+    def health(self, timeout=HEALTH_TIMEOUT):
+        return self._request("GET", "/health", timeout=timeout)
+
+    def summarize(self, texts, max_length=200):
+        with metrics.timed("model_client.summarize"):
+            return self._request("POST", "/summarize", {"texts": texts, "max_length": max_length})["summaries"]
+
+    def analyze(self, texts):
+        """Returns one ArticleAnalysis per text, built from the Docs the server parsed."""
+        from spacy.tokens import DocBin
+
+        with metrics.timed("model_client.analyze"):
+            response = self._request("POST", "/analyze", {"texts": texts})
+        # a blank vocabulary is enough to rebuild the Docs; the strings travel with them
+        vocab = self._vocabs.get(response["lang"])
+        if vocab is None:
+            import spacy
+            vocab = self._vocabs[response["lang"]] = spacy.blank(response["lang"]).vocab
+        docs = DocBin().from_bytes(base64.b64decode(response["docs"])).get_docs(vocab)
+        return [ArticleAnalysis(text, doc=doc) for text, doc in zip(texts, docs)]
+
+
+_client = None
+_down_until = 0.0
+_status = (0.0, None)  # (expires at, last answer)
+_state_lock = threading.Lock()
+
+
+def remote_enabled():
+    return bool(MODEL_SERVER)
+
+
+def get_client():
+    global _client
+    with _state_lock:
+        if _client is None and MODEL_SERVER:
+            _client = ModelClient(MODEL_SERVER)
+        return _client
+
+
+def _remote_call(func):
+    """
+    Runs func(client); returns (True, result) or (False, None) when the server is unset, unreachable,
+    still busy after its retries or failed the request. Only an unreachable server is skipped for a while.
+    """
+    global _down_until
+    client = get_client()
+    if client is None or time.monotonic() < _down_until:
+        return False, None
+    try:
+        return True, func(client)
+    except OSError as e:  # refused, reset or timed out
+        metrics.incr("model_client.fallback")
+        logger.warning("Model server %s unreachable (%s); using in-process models", client.address, e)
+        with _state_lock:
+            _down_until = time.monotonic() + DOWN_RETRY_SECONDS
+        return False, None
+    except (ModelServerBusy, ModelServerError) as e:
+        # the server is up: fall back for this call only, the next one tries the server again
+        metrics.incr("model_client.fallback")
+        logger.warning("Model server %s could not serve the request (%s); using in-process models",
+                       client.address, e)
+        return False, None
+
+
+def summarize(text, max_length=200):
+    """generate_summary through the model server when one is configured and reachable."""
+    if not text.strip():
+        return generate_summary(text, max_length)
+    ok, summaries = _remote_call(lambda client: client.summarize([text], max_length))
+    return summaries[0] if ok else generate_summary(text, max_length)
+
+
+def analyze(text):
+    """analyze_text through the model server when one is configured and reachable."""
+    analysis = cached_analysis(text)
+    if analysis is not None:
+        return analysis
+    ok, analyses = _remote_call(lambda client: client.analyze([text]))
+    if not ok:
+        return analyze_text(text)
+    remember_analysis(analyses[0])
+    return analyses[0]
+
+
+def warm_up():
+    """Loads the in-process models in the background, unless a model server holds them."""
+    if not remote_enabled():
+        model_registry.warm_up()
+
+
+def status():
+    """
+    Model states reported by the server, or by the local registry when there is no reachable server.
+    The server's answer is reused for STATUS_CACHE_SECONDS. A slow health check does not mark the
+    server as down.
+    """
+    global _status
+    if not remote_enabled():
+        return model_registry.status()
+    expires, models = _status
+    if time.monotonic() < expires:
+        return models
+    client = get_client()
+    models = None
+    if time.monotonic() >= _down_until:
+        try:
+            models = client.health()["models"]
+        except (OSError, ModelServerBusy, ModelServerError) as e:
+            logger.debug("Model server %s health check failed: %s", client.address, e)
+    if models is None:
+        models = {"server": "unreachable", **model_registry.status()}
+    _status = (time.monotonic() + STATUS_CACHE_SECONDS, models)
+    return models
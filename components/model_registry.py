@@ -0,0 +1,103 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# name -> loader callable; models are built on first use (or by warm_up) and kept for the process lifetime,
+# which in Streamlit spans every rerun and session served by the worker
+_loaders = {}
+_models = {}
+_errors = {}
+_load_seconds = {}
+_loading = set()
+_name_locks = {}
+_registry_lock = threading.Lock()
+
+
+def register(name, loader):
+    """Registers a zero-argument loader for a model; nothing is loaded until get() or warm_up()."""
+    with _registry_lock:
+        _loaders[name] = loader
+        _name_locks.setdefault(name, threading.Lock())
+
+
+def get(name):
+    """Returns the loaded model, loading it now if needed. Concurrent callers share one load."""
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    with _registry_lock:
+        if name not in _loaders:
+            raise KeyError(f"No model registered under {name!r}")
+        lock = _name_locks[name]
+
+    with lock:
+        if name in _models:
+            return _models[name]
+        with _registry_lock:
+            _loading.add(name)
+        start = time.perf_counter()
+        try:
+            model = _loaders[name]()
+        except Exception as e:
+            _errors[name] = e
+            raise
+        finally:
+            with _registry_lock:
+                _loading.discard(name)
+        _load_seconds[name] = time.perf_counter() - start
+        _errors.pop(name, None)
+        _models[name] = model
+        logger.info("Loaded model %s in %.1fs", name, _load_seconds[name])
+        return model
+
+
+def is_ready(name):
+    return name in _models
+
+
+def status():
+    """Returns {name: "ready" | "loading" | "failed: ..." | "not loaded"} for every registered model."""
+    with _registry_lock:
+        names = list(_loaders)
+        loading = set(_loading)
+    result = {}
+    for name in names:
+        if name in _models:
+            result[name] = "ready"
+        elif name in loading:
+            result[name] = "loading"
+        elif name in _errors:
+            result[name] = f"failed: {_errors[name]}"
+        else:
+            result[name] = "not loaded"
+    return result
+
+
+def warm_up(names=None, background=True):
+    """
+    Loads the given models (default: all registered) that are not loaded or loading yet.
+    With background=True this happens on a daemon thread, which is returned.
+    """
+    with _registry_lock:
+        pending = [n for n in (names or list(_loaders)) if n not in _models and n not in _loading]
+        # mark them now so a rerun racing this call does not start a second warm-up
+        _loading.update(pending)
+
+    def _load_all():
+        for name in pending:
+            with _registry_lock:
+                _loading.discard(name)
+            try:
+                get(name)
+            except Exception as e:
+                logger.warning("Warm-up of model %s failed: %s", name, e)
+
+    if not background:
+        _load_all()
+        return None
+    thread = threading.Thread(target=_load_all, name="model-warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,36 @@
+import os
+
+# on-disk caches (glossary, results, http, indexes) live under this directory
+CACHE_DIR = os.environ.get(
+    "EXPLAINEE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "explainee")
+)
+
+
+def cache_path(name):
+    """Returns the path of a file inside CACHE_DIR, creating the directory if needed."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, name)
+
+# model identifiers; also part of the result cache key so a model change invalidates old analyses
+SPACY_MODEL = "en_core_web_sm"
+SUMMARIZER_MODEL = "sshleifer/distilbart-cnn-12-6"
+
+# spaCy throughput: texts are parsed in shards of at most SPACY_SHARD_CHARS characters (cut at
+# paragraph boundaries, well under nlp.max_length), run through nlp.pipe in batches of
+# SPACY_BATCH_SIZE and, with SPACY_PROCESSES > 1, on that many worker processes
+SPACY_SHARD_CHARS = int(os.environ.get("EXPLAINEE_SPACY_SHARD_CHARS", "20000"))
+SPACY_BATCH_SIZE = int(os.environ.get("EXPLAINEE_SPACY_BATCH_SIZE", "32"))
+SPACY_PROCESSES = int(os.environ.get("EXPLAINEE_SPACY_PROCESSES", "1"))
+
+# summarization engine ("torch", "quantized" or "onnx") and beam count; outputs differ between them
+SUMMARIZER_BACKEND = os.environ.get("EXPLAINEE_SUMMARIZER_BACKEND", "torch")
+SUMMARY_NUM_BEAMS = int(os.environ.get("EXPLAINEE_SUMMARY_BEAMS", "4"))
+
+# default time budget of one analysis in the app, in seconds (0: wait for every model); past it the
+# summary falls back to the extractive one and remaining glossary lookups are skipped
+LATENCY_BUDGET_S = float(os.environ.get("EXPLAINEE_LATENCY_BUDGET", "30"))
+
+# offline knowledge base for glossary definitions (built with build_kb.py); live Wikipedia is only
+# asked for terms it lacks, unless EXPLAINEE_WIKIPEDIA_FALLBACK=0
+KB_PATH = os.environ.get("EXPLAINEE_KB", os.path.join(CACHE_DIR, "kb"))
+WIKIPEDIA_FALLBACK = os.environ.get("EXPLAINEE_WIKIPEDIA_FALLBACK", "1") != "0"
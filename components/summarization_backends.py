@@ -0,0 +1,130 @@
+import os
+
+from components.settings import cache_path, SUMMARIZER_BACKEND, SUMMARIZER_MODEL, SUMMARY_NUM_BEAMS
+
+MIN_LENGTH = 30
+
+
+class GenerationOptions:
+    """Decoding settings shared by every backend; max_length is given per call (partials are shorter)."""
+
+    def __init__(self, num_beams=SUMMARY_NUM_BEAMS, min_length=MIN_LENGTH, early_stopping=True,
+                 no_repeat_ngram_size=3, length_penalty=2.0):
+        self.num_beams = num_beams
+        self.min_length = min_length
+        self.early_stopping = early_stopping
+        self.no_repeat_ngram_size = no_repeat_ngram_size
+        self.length_penalty = length_penalty
+
+    def generate_kwargs(self, max_length):
+        return {
+            "max_length": max_length,
+            "min_length": min(self.min_length, max_length - 1),
+            "num_beams": self.num_beams,
+            "early_stopping": self.early_stopping and self.num_beams > 1,
+            "no_repeat_ngram_size": self.no_repeat_ngram_size,
+            "length_penalty": self.length_penalty,
+            "do_sample": False,
+        }
+
+
+class SummarizerBackend:
+    """
+    Interface for summarization engines: summarize(texts, max_length, batch_size) -> list of str,
+    plus the `tokenizer` used to chunk long documents.
+    """
+
+    name = None
+
+    def __init__(self, model_name=SUMMARIZER_MODEL, options=None):
+        self.model_name = model_name
+        self.options = options or GenerationOptions()
+        self.tokenizer = None
+
+    def summarize(self, texts, max_length, batch_size):
+        raise NotImplementedError
+
+
+class _PipelineBackend(SummarizerBackend):
+    """Backends that wrap a transformers summarization pipeline around some seq2seq model."""
+
+    def __init__(self, model_name=SUMMARIZER_MODEL, options=None):
+        super().__init__(model_name, options)
+        from transformers import AutoTokenizer, pipeline
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.pipeline = pipeline("summarization", model=self._load_model(), tokenizer=self.tokenizer)
+
+    def _load_model(self):
+        raise NotImplementedError
+
+    def summarize(self, texts, max_length, batch_size):
+        results = self.pipeline(texts, truncation=True, batch_size=batch_size,
+                                **self.options.generate_kwargs(max_length))
+        return [r["summary_text"].strip() for r in results]
+
+
+class TorchBackend(_PipelineBackend):
+    """The reference engine: full-precision PyTorch on CPU."""
+
+    name = "torch"
+
+    def _load_model(self):
+        from transformers import AutoModelForSeq2SeqLM
+        return AutoModelForSeq2SeqLM.from_pretrained(self.model_name).eval()
+
+
+class QuantizedTorchBackend(TorchBackend):
+    """PyTorch with the Linear layers dynamically quantized to int8; weights are converted at load time."""
+
+    name = "quantized"
+
+    def _load_model(self):
+        import torch
+        return torch.quantization.quantize_dynamic(super()._load_model(), {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class OnnxBackend(_PipelineBackend):
+    """
+    ONNX Runtime through optimum. The model is exported on first use and kept under CACHE_DIR,
+    so later processes load the exported graphs directly.
+    """
+
+    name = "onnx"
+
+    def _load_model(self):
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        except ImportError as e:
+            raise ImportError("The onnx summarizer backend needs optimum[onnxruntime] installed") from e
+
+        export_dir = cache_path(os.path.join("onnx", self.model_name.replace("/", "--")))
+        if os.path.isfile(os.path.join(export_dir, "config.json")):
+            return ORTModelForSeq2SeqLM.from_pretrained(export_dir)
+        model = ORTModelForSeq2SeqLM.from_pretrained(self.model_name, export=True)
+        model.save_pretrained(export_dir)
+        return model
+
+
+_backends = {
+    TorchBackend.name: TorchBackend,
+    QuantizedTorchBackend.name: QuantizedTorchBackend,
+    OnnxBackend.name: OnnxBackend,
+}
+
+
+def register_backend(name, factory):
+    """Adds a summarization backend; `factory(model_name=..., options=...)` builds it."""
+    _backends[name] = factory
+
+
+def backend_names():
+    return list(_backends)
+
+
+def make_backend(name=None, model_name=SUMMARIZER_MODEL, options=None):
+    """Builds the named backend, or the configured one (EXPLAINEE_SUMMARIZER_BACKEND, "torch" if unset)."""
+    name = name or SUMMARIZER_BACKEND
+    if name not in _backends:
+        raise ValueError(f"Unknown summarizer backend {name!r}; choose from {', '.join(_backends)}")
+    return _backends[name](model_name=model_name, options=options)
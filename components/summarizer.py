@@ -1,17 +1,173 @@
-from transformers import pipeline
+import re
+from components import metrics, model_registry
+from components.extractor import keyword_lemmas
+from components.summarization_backends import make_backend
 
-summarizer = pipeline("summarization", model="sshleifer/distilbart-cnn-12-6")
 
-def generate_summary(text, max_length=200):
+def _load_summarizer():
+    return make_backend()
+
+
+# the configured backend (EXPLAINEE_SUMMARIZER_BACKEND) is loaded on first use (or by the registry's warm-up)
+model_registry.register("summarizer", _load_summarizer)
+
+
+def get_summarizer():
+    """Returns the process-wide SummarizerBackend."""
+    return model_registry.get("summarizer")
+
+# distilbart reads at most 1024 tokens; chunks leave headroom for the special tokens
+CHUNK_TOKENS = 900
+BATCH_SIZE = 8
+MAX_REDUCE_LEVELS = 2
+PARTIAL_MAX_LENGTH = 120
+
+# generate_summary(ies) return the failure, prefixed with this, in place of a summary
+SUMMARY_ERROR_PREFIX = "Error: "
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?।])\s+|\n+")
+
+
+def split_into_chunks(text, chunk_tokens=CHUNK_TOKENS, backend=None):
+    """
+    Splits text on sentence boundaries into chunks of at most chunk_tokens model tokens.
+    Sentences longer than a whole chunk are cut on token boundaries.
+    """
+    tokenizer = (backend or get_summarizer()).tokenizer
+    chunks = []
+    current = []
+    current_tokens = 0
+
+    for sentence in _SENTENCE_BOUNDARY.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        token_ids = tokenizer.encode(sentence, add_special_tokens=False)
+
+        if len(token_ids) > chunk_tokens:
+            if current:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            for start in range(0, len(token_ids), chunk_tokens):
+                piece = token_ids[start:start + chunk_tokens]
+                chunks.append(tokenizer.decode(piece, skip_special_tokens=True).strip())
+            continue
+
+        if current and current_tokens + len(token_ids) > chunk_tokens:
+            chunks.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(sentence)
+        current_tokens += len(token_ids)
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _summarize_batch(texts, max_length, batch_size, backend=None):
+    metrics.observe("summarizer.batch_size", len(texts))
+    with metrics.timed("summarizer.batch"):
+        return (backend or get_summarizer()).summarize(texts, max_length, batch_size)
+
+
+def summarize_long_documents(texts, max_length=200, chunk_tokens=CHUNK_TOKENS,
+                             batch_size=BATCH_SIZE, max_reduce_levels=MAX_REDUCE_LEVELS, backend=None):
+    """
+    Map-reduce summaries: at each level the chunks of every text are summarized as one batch,
+    then the joined partial summaries are re-chunked, for up to max_reduce_levels levels.
+    A final batched pass produces one summary per text. `backend` defaults to the process-wide one.
+    """
+    chunk_lists = [split_into_chunks(text, chunk_tokens, backend) for text in texts]
+    for _ in range(max_reduce_levels):
+        multi = [i for i, chunks in enumerate(chunk_lists) if len(chunks) > 1]
+        if not multi:
+            break
+        flat = [chunk for i in multi for chunk in chunk_lists[i]]
+        partials = _summarize_batch(flat, PARTIAL_MAX_LENGTH, batch_size, backend)
+        offset = 0
+        for i in multi:
+            count = len(chunk_lists[i])
+            chunk_lists[i] = split_into_chunks(" ".join(partials[offset:offset + count]), chunk_tokens, backend)
+            offset += count
+
+    # out of reduce levels: the final pass sees as much of each text as fits the window
+    return _summarize_batch([" ".join(chunks) for chunks in chunk_lists], max_length, batch_size, backend)
+
+
+def summarize_long_document(text, max_length=200, chunk_tokens=CHUNK_TOKENS,
+                            batch_size=BATCH_SIZE, max_reduce_levels=MAX_REDUCE_LEVELS):
+    return summarize_long_documents([text], max_length, chunk_tokens, batch_size, max_reduce_levels)[0]
+
+
+def generate_summary(text, max_length=200, long_document=True, chunk_tokens=CHUNK_TOKENS,
+                     batch_size=BATCH_SIZE, max_reduce_levels=MAX_REDUCE_LEVELS):
     if not text.strip():
         return "No content to summarize."
 
-    # Truncate input if too long (approx. 3500 characters ~ 1024 tokens)
-    if len(text) > 3500:
-        text = text[:3500]
+    metrics.observe("summarizer.input_chars", len(text))
+    try:
+        if long_document:
+            return summarize_long_document(text, max_length, chunk_tokens, batch_size, max_reduce_levels)
 
+        # Truncate input if too long (approx. 3500 characters ~ 1024 tokens)
+        if len(text) > 3500:
+            text = text[:3500]
+        return _summarize_batch([text], max_length, 1)[0]
+    except Exception as e:
+        metrics.incr("summarizer.error")
+        return f"{SUMMARY_ERROR_PREFIX}{e}"
+
+
+def generate_summaries(texts, max_length=200, chunk_tokens=CHUNK_TOKENS,
+                       batch_size=BATCH_SIZE, max_reduce_levels=MAX_REDUCE_LEVELS, backend=None):
+    """
+    Batched generate_summary for many texts (long-document mode); one result string per text.
+    """
+    summaries = ["No content to summarize." if not text.strip() else None for text in texts]
+    todo = [i for i, summary in enumerate(summaries) if summary is None]
+    if not todo:
+        return summaries
     try:
-        summary = summarizer(text, max_length=max_length, min_length=30, do_sample=False)
-        return summary[0]["summary_text"]
+        results = summarize_long_documents([texts[i] for i in todo], max_length, chunk_tokens,
+                                           batch_size, max_reduce_levels, backend)
     except Exception as e:
-        return f"Error: {str(e)}"
+        metrics.incr("summarizer.error")
+        results = [f"{SUMMARY_ERROR_PREFIX}{e}"] * len(todo)
+    for i, summary in zip(todo, results):
+        summaries[i] = summary
+    return summaries
+
+
+def summary_failed(summary):
+    """True when a summary string is the error text generate_summary(ies) return on failure."""
+    return summary.startswith(SUMMARY_ERROR_PREFIX)
+
+
+# sentences picked by the extractive fallback, and the shortest sentence (in tokens) it considers
+EXTRACTIVE_SENTENCES = 3
+EXTRACTIVE_MIN_TOKENS = 6
+# extra weight for sentences near the top, where news articles put their lead
+EXTRACTIVE_LEAD_WEIGHT = 0.3
+
+
+def extractive_summary(analysis, max_sentences=EXTRACTIVE_SENTENCES):
+    """
+    Fast summary without the model: picks the sentences of an ArticleAnalysis that carry the most
+    of the article's keywords (ArticleAnalysis.keyword_counts), slightly favouring the lead, and
+    returns them in document order.
+    """
+    sentences = [s for s in analysis.sentences if len(s) >= EXTRACTIVE_MIN_TOKENS] or analysis.sentences
+    if not sentences:
+        return "No content to summarize."
+
+    counts = analysis.keyword_counts()
+    top = max(counts.values(), default=0)
+    scored = []
+    for i, sentence in enumerate(sentences):
+        weight = sum(counts[lemma] for lemma in keyword_lemmas(sentence)) / top if top else 0.0
+        lead = EXTRACTIVE_LEAD_WEIGHT * (1 - i / len(sentences))
+        scored.append((weight / len(sentence) ** 0.5 + lead, i))
+
+    picked = sorted(i for _, i in sorted(scored, reverse=True)[:max_sentences])
+    metrics.incr("summarizer.extractive")
+    return " ".join(sentences[i].text.strip() for i in picked)
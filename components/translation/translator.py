@@ -1,41 +1,300 @@
-from googletrans import Translator
-from langdetect import detect
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from langdetect import DetectorFactory, detect_langs
+from components import metrics, model_registry
 from components.translation.language_map import LANGUAGE_MAP
 
-translator = Translator()
+logger = logging.getLogger(__name__)
 
-def detect_language(text):
+# paragraphs are translated concurrently, each request stays under the backend's size limit
+TRANSLATION_WORKERS = 4
+MAX_SEGMENT_CHARS = 4500
+MEMORY_MAX_ENTRIES = 5000
+
+# language detection reads a bounded sample and only reads more when unsure
+DETECT_SAMPLE_CHARS = 1500
+DETECT_MIN_CONFIDENCE = 0.9
+DETECT_CACHE_SIZE = 1024
+# paragraphs shorter than this are too short to detect on their own
+DETECT_MIN_SEGMENT_CHARS = 40
+
+# langdetect is randomized; a fixed seed makes it deterministic
+DetectorFactory.seed = 0
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?।。])\s+")
+
+
+class TranslationBackend:
+    """
+    Interface for translation engines. Implementations translate one segment and raise on failure.
+    """
+
+    def translate(self, text, src, dest):
+        raise NotImplementedError
+
+
+class GoogleTranslateBackend(TranslationBackend):
+    def __init__(self):
+        from googletrans import Translator
+        self._translator = Translator()
+
+    def translate(self, text, src, dest):
+        return self._translator.translate(text, src=src, dest=dest).text
+
+
+class TranslationMemory:
+    """
+    Bounded in-process LRU of translated segments keyed by (src, dest, segment hash).
+    """
+
+    def __init__(self, max_entries=MEMORY_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text, src, dest):
+        return src, dest, hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def get(self, text, src, dest):
+        key = self.key(text, src, dest)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, text, src, dest, translated):
+        key = self.key(text, src, dest)
+        with self._lock:
+            self._entries[key] = translated
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+translation_memory = TranslationMemory()
+
+# the default client is created on first use (or by the registry's warm-up)
+model_registry.register("translator", GoogleTranslateBackend)
+
+
+def set_backend(backend):
+    """Replaces the translation backend (e.g. with a local fake in tests or benchmarks)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def get_backend():
+    with _backend_lock:
+        backend = _backend
+    return backend if backend is not None else model_registry.get("translator")
+
+
+_detect_cache = OrderedDict()
+_detect_lock = threading.Lock()
+
+
+def clear_detection_cache():
+    with _detect_lock:
+        _detect_cache.clear()
+
+
+def _sample(paragraphs, max_chars):
+    """Evenly spaced paragraphs (always including the first) up to max_chars; deterministic."""
+    total = sum(len(p) for p in paragraphs)
+    if total <= max_chars:
+        return "\n\n".join(paragraphs)
+    # take every step-th paragraph so the sample spans the whole article
+    step = max(1, round(total / max_chars))
+    picked, size = [], 0
+    for p in paragraphs[::step]:
+        picked.append(p[:max_chars - size])
+        size += len(picked[-1])
+        if size >= max_chars:
+            break
+    return "\n\n".join(picked)
+
+
+def _detect_uncached(text, sample_chars, min_confidence):
+    paragraphs = [p.strip() for p in split_segments(text) if p.strip()]
+    total = sum(len(p) for p in paragraphs)
+    budget = sample_chars
+    while True:
+        candidates = detect_langs(_sample(paragraphs, budget))
+        best = candidates[0]
+        if best.prob >= min_confidence or budget >= total:
+            return best.lang, best.prob
+        budget *= 4  # low confidence: escalate to more of the text
+
+
+def detect_language_with_confidence(text, sample_chars=DETECT_SAMPLE_CHARS, min_confidence=DETECT_MIN_CONFIDENCE):
+    """
+    Returns (language_code, confidence) from a deterministic sample of the text's paragraphs,
+    memoized by content hash. ("unknown", 0.0) when nothing can be detected.
+    """
+    key = (hashlib.sha1(text.encode("utf-8")).hexdigest(), sample_chars, min_confidence)
+    with _detect_lock:
+        if key in _detect_cache:
+            _detect_cache.move_to_end(key)
+            return _detect_cache[key]
     try:
-        return detect(text)
-    except:
-        return "unknown"
+        result = _detect_uncached(text, sample_chars, min_confidence)
+    except Exception:
+        result = ("unknown", 0.0)
+    with _detect_lock:
+        _detect_cache[key] = result
+        while len(_detect_cache) > DETECT_CACHE_SIZE:
+            _detect_cache.popitem(last=False)
+    return result
+
+
+def detect_language(text):
+    return detect_language_with_confidence(text)[0]
+
+
+def detect_paragraph_languages(paragraphs, default_lang="unknown"):
+    """
+    Detects each paragraph on its own (mixed-language pages). Paragraphs too short to detect,
+    or detected with low confidence, get default_lang.
+    """
+    languages = []
+    for paragraph in paragraphs:
+        if len(paragraph.strip()) < DETECT_MIN_SEGMENT_CHARS:
+            languages.append(default_lang)
+            continue
+        code, confidence = detect_language_with_confidence(paragraph)
+        languages.append(code if code != "unknown" and confidence >= DETECT_MIN_CONFIDENCE else default_lang)
+    return languages
+
+def looks_mixed(text, src_lang):
+    """
+    True when a page may mix languages: detection of the whole text is unsure or disagrees with src_lang,
+    or the first and second half of its paragraphs are detected as different languages.
+    """
+    code, confidence = detect_language_with_confidence(text)
+    if code != src_lang or confidence < DETECT_MIN_CONFIDENCE:
+        return True
+    paragraphs = [p for p in split_segments(text) if p.strip()]
+    if len(paragraphs) < 2:
+        return False
+    middle = len(paragraphs) // 2
+    halves = ("\n\n".join(paragraphs[:middle]), "\n\n".join(paragraphs[middle:]))
+    return any(detect_language_with_confidence(half)[0] != src_lang for half in halves)
 
 def get_language_name(code):
     return LANGUAGE_MAP.get(code, "Unknown")
 
-def translate_to_english(text, src_lang):
+
+def split_segments(text):
+    """Splits text at the "\\n\\n" paragraph joins used throughout the pipeline."""
+    return text.split("\n\n")
+
+
+def _split_long_segment(segment, max_chars=MAX_SEGMENT_CHARS):
+    if len(segment) <= max_chars:
+        return [segment]
+    pieces, current = [], ""
+    for sentence in _SENTENCE_BOUNDARY.split(segment):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _translate_piece(piece, src, dest, backend, memory):
+    cached = memory.get(piece, src, dest)
+    if cached is not None:
+        metrics.incr("translation.memory_hit")
+        return cached
+    metrics.incr("translation.backend_call")
+    metrics.observe("translation.segment_chars", len(piece))
     try:
-        if src_lang == "en":
-            return text
-        result = translator.translate(text, src=src_lang, dest='en')
-        return result.text
-    except:
-        return text  # fallback
+        with metrics.timed("translation.backend"):
+            translated = backend.translate(piece, src, dest)
+    except Exception as e:
+        metrics.incr("translation.fallback")
+        logger.warning("Translation %s->%s failed for a %d-char segment: %s", src, dest, len(piece), e)
+        return piece  # fallback, not remembered so it is retried next time
+    memory.put(piece, src, dest, translated)
+    return translated
 
-def translate_text(text, src_lang, target_lang):
+
+def _translate_segment(segment, src, dest, backend, memory, per_segment_detection=False):
+    if not segment.strip():
+        return segment
+    if per_segment_detection:
+        # mixed-language pages: paragraphs already in the target language are kept as they are
+        segment_lang = detect_paragraph_languages([segment], default_lang=src)[0]
+        if segment_lang == dest:
+            metrics.incr("translation.segment_skipped")
+            return segment
+        if segment_lang != "unknown":
+            src = segment_lang
+    pieces = _split_long_segment(segment)
+    return " ".join(_translate_piece(p, src, dest, backend, memory) for p in pieces)
+
+
+def translate_segments(text, src_lang, dest_lang, max_workers=TRANSLATION_WORKERS, backend=None, memory=None,
+                       per_segment_detection=False):
+    """
+    Translates text paragraph by paragraph on a bounded pool and yields the translated
+    paragraphs in order as soon as each one (and all before it) is done.
+    With per_segment_detection, each paragraph's own language decides whether (and from what) it is translated.
+    """
+    segments = split_segments(text)
+    if src_lang == dest_lang:
+        yield from segments
+        return
+
+    backend = backend or get_backend()
+    memory = memory or translation_memory
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(segments))))
     try:
-        if src_lang == target_lang:
-            return text
-        result = translator.translate(text, src=src_lang, dest=target_lang)
-        return result.text
-    except:
-        return text  # fallback
+        futures = [
+            pool.submit(metrics.run_in_context(_translate_segment), s, src_lang, dest_lang, backend, memory,
+                        per_segment_detection)
+            for s in segments
+        ]
+        for future in futures:
+            yield future.result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def translate_to_english(text, src_lang):
+    if src_lang == "en":
+        return text
+    # on a mixed-language page, paragraphs already in English are not sent to the backend
+    return "\n\n".join(translate_segments(text, src_lang, "en", per_segment_detection=looks_mixed(text, src_lang)))
+
+def translate_text(text, src_lang, target_lang):
+    if src_lang == target_lang:
+        return text
+    return "\n\n".join(translate_segments(text, src_lang, target_lang))
 
 def translate_text_block(text, dest_lang, src_lang="en"):
-    try:
-        if dest_lang == src_lang:
-            return text
-        result = translator.translate(text, src=src_lang, dest=dest_lang)
-        return result.text
-    except:
+    if dest_lang == src_lang:
         return text
+    return "\n\n".join(translate_segments(text, src_lang, dest_lang))
@@ -0,0 +1,249 @@
+"""
+Local inference server: one copy of the spaCy and summarization models shared by every app worker.
+
+    python model_server.py --port 8765
+    python model_server.py --socket /run/explainee/models.sock
+
+Point the app at it with EXPLAINEE_MODEL_SERVER=http://127.0.0.1:8765 (or unix:///run/explainee/models.sock).
+Concurrent requests are grouped into micro-batches: a batch is run as soon as it is full or the oldest
+request has waited --max-wait-ms. Once --max-pending texts are queued for a model, new requests get
+503 with Retry-After until the queue drains.
+"""
+
+import argparse
+import base64
+import json
+import logging
+import os
+import queue
+import socketserver
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from components import metrics, model_registry
+from components.extractor import analyze_texts, get_nlp
+from components.summarizer import generate_summaries
+
+logger = logging.getLogger("model_server")
+
+MAX_BATCH = 16
+MAX_WAIT_MS = 20
+MAX_PENDING = 256
+REQUEST_TIMEOUT = 300
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, float("inf"))
+# every app worker may hold several requests open at once; the default listen backlog of 5 is too short
+LISTEN_BACKLOG = 128
+
+
+class Overloaded(RuntimeError):
+    pass
+
+
+class MicroBatcher:
+    """
+    Collects items submitted from many threads and hands them to `func(keys, payloads)` in batches,
+    on one worker thread, so the model is used by a single thread. Items with different keys
+    (e.g. summary lengths) may share a batch; func groups them as it needs.
+    """
+
+    def __init__(self, name, func, max_batch=MAX_BATCH, max_wait=MAX_WAIT_MS / 1000, max_pending=MAX_PENDING):
+        self.name = name
+        self.func = func
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_pending = max_pending
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        threading.Thread(target=self._run, name=f"batcher-{name}", daemon=True).start()
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def submit(self, key, payloads):
+        """Queues the payloads and returns one Future per payload; raises Overloaded when the queue is full."""
+        futures = [Future() for _ in payloads]
+        with self._lock:
+            if self._queue.qsize() + len(payloads) > self.max_pending:
+                metrics.incr(f"model_server.{self.name}.rejected")
+                raise Overloaded(f"{self.name} queue is full")
+            for payload, future in zip(payloads, futures):
+                self._queue.put((key, payload, future))
+        return futures
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            metrics.observe(f"model_server.{self.name}.batch_size", len(batch), buckets=BATCH_BUCKETS)
+            try:
+                with metrics.timed(f"model_server.{self.name}"):
+                    results = self.func([key for key, _, _ in batch], [payload for _, payload, _ in batch])
+            except Exception as e:
+                logger.exception("%s batch failed", self.name)
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, _, future), result in zip(batch, results):
+                future.set_result(result)
+
+
+def _summarize(keys, texts):
+    summaries = [None] * len(texts)
+    for max_length in set(keys):
+        idx = [i for i, key in enumerate(keys) if key == max_length]
+        for i, summary in zip(idx, generate_summaries([texts[i] for i in idx], max_length=max_length)):
+            summaries[i] = summary
+    return summaries
+
+
+def _analyze(keys, texts):
+    return [analysis.doc for analysis in analyze_texts(texts)]
+
+
+class ModelServer:
+    def __init__(self, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS, max_pending=MAX_PENDING):
+        options = dict(max_batch=max_batch, max_wait=max_wait_ms / 1000, max_pending=max_pending)
+        self.batchers = {
+            "summarize": MicroBatcher("summarize", _summarize, **options),
+            "analyze": MicroBatcher("analyze", _analyze, **options),
+        }
+
+    def summarize(self, payload):
+        futures = self.batchers["summarize"].submit(int(payload.get("max_length", 200)), payload["texts"])
+        return {"summaries": [f.result(REQUEST_TIMEOUT) for f in futures]}
+
+    def analyze(self, payload):
+        from spacy.tokens import DocBin
+
+        futures = self.batchers["analyze"].submit(None, payload["texts"])
+        docs = DocBin(docs=[f.result(REQUEST_TIMEOUT) for f in futures]).to_bytes()
+        return {"lang": get_nlp().lang, "docs": base64.b64encode(docs).decode("ascii")}
+
+    def health(self):
+        return {
+            "models": model_registry.status(),
+            "pending": {name: batcher.pending for name, batcher in self.batchers.items()},
+        }
+
+
+def make_handler(model_server):
+    routes = {
+        ("GET", "/health"): lambda _: model_server.health(),
+        ("POST", "/summarize"): model_server.summarize,
+        ("POST", "/analyze"): model_server.analyze,
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, payload, headers=None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _handle(self, method):
+            route = routes.get((method, self.path.rstrip("/")))
+            if route is None:
+                self._send(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length)) if length else {}
+                if method == "POST" and not isinstance(payload.get("texts"), list):
+                    raise ValueError('"texts" must be a list')
+            except ValueError as e:
+                self._send(400, {"error": f"bad request: {e}"})
+                return
+            try:
+                self._send(200, route(payload))
+            except Overloaded as e:
+                self._send(503, {"error": str(e)}, {"Retry-After": "1"})
+            except FutureTimeout:
+                self._send(504, {"error": "model timed out"})
+            except Exception as e:
+                logger.exception("request failed")
+                self._send(500, {"error": str(e)})
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+        def address_string(self):
+            # Unix socket clients have no address
+            return self.client_address[0] if self.client_address else "unix"
+
+        def log_message(self, format, *args):
+            logger.debug("%s - %s", self.address_string(), format % args)
+
+    return Handler
+
+
+class _TCPServer(ThreadingHTTPServer):
+    request_queue_size = LISTEN_BACKLOG
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    request_queue_size = LISTEN_BACKLOG
+
+
+def serve(port=None, socket_path=None, host="127.0.0.1", **options):
+    handler = make_handler(ModelServer(**options))
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = _UnixServer(socket_path, handler)
+    else:
+        server = _TCPServer((host, port), handler)
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the Explainee models to local app workers.")
+    where = parser.add_mutually_exclusive_group()
+    where.add_argument("--port", type=int, default=8765)
+    where.add_argument("--socket", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    parser.add_argument("--max-pending", type=int, default=MAX_PENDING)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    metrics.configure_from_env()
+    server = serve(args.port, args.socket, args.host, max_batch=args.max_batch,
+                   max_wait_ms=args.max_wait_ms, max_pending=args.max_pending)
+    model_registry.warm_up(background=False)
+    logger.info("Serving models on %s", args.socket or f"http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import time
+from datetime import datetime
+
+import streamlit as st
+
+try:
+    from services.article_index import get_article_index
+    INDEX_AVAILABLE = True
+except ImportError:
+    INDEX_AVAILABLE = False
+
+LABEL_NAMES = {"PERSON": "person", "ORG": "organization", "GPE": "place"}
+
+
+st.set_page_config(
+    page_title="Explainee — Across Articles",
+    page_icon="📚",
+    layout="wide",
+)
+
+st.title("Across Articles")
+st.caption("People, organizations and places from every article analysed so far, in the app or with batch.py.")
+
+if not INDEX_AVAILABLE:
+    st.error("Service files are missing.")
+    st.stop()
+
+article_index = get_article_index()
+stats = article_index.stats()
+st.caption(f"{stats['articles']} articles · {stats['terms']} entities · {stats['postings']} mentions "
+           f"in {stats['segments']} segments ({stats['segment_bytes'] / 1024:.0f} KiB)")
+
+query = st.text_input("Person, organization or place", placeholder="e.g. ISRO")
+if not query:
+    st.stop()
+
+matches = article_index.find_terms(query)
+if not matches:
+    st.info("No analysed article mentions that name yet.")
+    st.stop()
+
+col1, col2 = st.columns([3, 1])
+with col1:
+    entity = st.selectbox(
+        "Entity", matches,
+        format_func=lambda m: f"{m['name']} ({LABEL_NAMES.get(m['label'], m['label'])}, {m['articles']} articles)")
+with col2:
+    days = st.number_input("Last N days (0 = all)", min_value=0, max_value=3650, value=0)
+since = time.time() - days * 86400 if days else None
+
+recent_col, related_col = st.columns([2, 1])
+with recent_col:
+    st.subheader("Recent articles")
+    articles = article_index.articles_mentioning(entity["name"], entity["label"], since=since, limit=50)
+    if not articles:
+        st.info("None in this period.")
+    for article in articles:
+        added = datetime.fromtimestamp(article["added_at"]).strftime("%d %b %Y, %H:%M")
+        st.markdown(f"**[{article['title'] or article['url']}]({article['url']})**  \n"
+                    f"{article['source'] or ''} · analysed {added}")
+
+with related_col:
+    st.subheader("Mentioned alongside")
+    related = article_index.cooccurring(entity["name"], entity["label"], since=since, top_n=15)
+    if related:
+        st.table([{"name": r["name"], "type": LABEL_NAMES.get(r["label"], r["label"]), "shared articles": r["articles"]}
+                  for r in related])
+    else:
+        st.info("No other entities in these articles.")
@@ -0,0 +1,165 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from components.extractor import analyze_texts
+from components.settings import SPACY_BATCH_SIZE, SPACY_PROCESSES
+from components.translation.translator import split_segments, translate_segments
+from services.article_context import ArticleContext
+from services.localization import localize_insights
+from services.near_duplicates import paragraph_key
+from services.summary_generator import summarize_articles
+from services.glossary_builder import build_glossary
+from services.location_extractor import extract_locations
+
+GLOSSARY_WORKERS = 8
+# a near-duplicate is only reused while at most this share of its paragraphs is new
+REUSE_MAX_CHANGED = 0.3
+
+
+def make_article_data(context, english_summary, english_glossary, locations,
+                      original_summary=None, original_glossary=None, tiers=None, entities=None):
+    """
+    Builds the article_data dict that app.py keeps in st.session_state and the result cache stores.
+    Without original-language insights (untranslated article) the English ones are used.
+    `tiers` records degraded steps, e.g. {"summary": "extractive", "glossary_skipped": 3}.
+    `entities` ({"PERSON": [...], "ORG": [...]}, ranked) defaults to the one build_glossary recorded.
+    """
+    return {
+        "title": context.title or "No title found",
+        "source": context.source or "",
+        "locations": locations,
+        "lang_code": context.lang_code,
+        "lang_name": context.lang_name,
+        "was_translated": context.was_translated,
+        "english_content": context.translated_text,
+        "original_content": context.original_text,
+        "english_summary": english_summary,
+        "original_summary": original_summary if original_summary is not None else english_summary,
+        "english_glossary": english_glossary,
+        "original_glossary": original_glossary if original_glossary is not None else english_glossary,
+        "tiers": tiers or {},
+        "entities": entities if entities is not None else context.artifacts.get("entities", {}),
+    }
+
+
+def _analyse_batch(contexts, nlp_batch_size, nlp_processes):
+    texts = [c.translated_text for c in contexts]
+    for context, analysis in zip(contexts, analyze_texts(texts, nlp_batch_size, n_process=nlp_processes)):
+        context.artifacts["analysis"] = analysis
+    summarize_articles(contexts)
+
+
+def analyze_articles(contexts, max_entities=15, nlp_batch_size=SPACY_BATCH_SIZE, nlp_processes=SPACY_PROCESSES,
+                     glossary_workers=GLOSSARY_WORKERS):
+    """
+    Batch version of the app's analysis: spaCy runs through nlp.pipe (on nlp_processes worker
+    processes when there are enough paragraph shards) and the summarizer batches the chunks of all
+    articles together, while glossary lookups and the localization of translated articles' insights
+    run on a thread pool.
+    Returns one article_data dict per context, or the exception raised while finishing that article.
+    """
+    _analyse_batch(contexts, nlp_batch_size, nlp_processes)
+
+    def finish(context):
+        try:
+            return _finish(context)
+        except Exception as e:
+            return e
+
+    def _finish(context):
+        glossary = build_glossary(context, max_entities=max_entities)
+        original_summary = original_glossary = None
+        if context.was_translated:
+            original_summary, original_glossary = localize_insights(
+                context.artifacts["summary"], glossary, context.lang_code)
+        return make_article_data(
+            context,
+            context.artifacts["summary"],
+            glossary,
+            extract_locations(context),
+            original_summary,
+            original_glossary,
+        )
+
+    with ThreadPoolExecutor(max_workers=glossary_workers) as pool:
+        return list(pool.map(finish, contexts))
+
+
+def reuse_analysis(previous, article_text, title=None, source=None, url=None, max_entities=15):
+    """
+    Adapts the article_data of a near-duplicate (a syndicated copy of the same story) to this article.
+    Paragraphs found in the previous copy keep their translation; only the new ones are translated,
+    parsed, and have their PERSON/ORG and GPE entities added to the glossary and locations. The summary
+    is reused. Returns the article_data with a "reused" entry, or None when too much of the text is new
+    (or the previous copy's paragraphs do not line up with its translation, or it predates the
+    "entities" field).
+    """
+    if "entities" not in previous:
+        return None
+    old_original = split_segments(previous["original_content"])
+    old_english = split_segments(previous["english_content"])
+    if len(old_original) != len(old_english):
+        return None
+    known = {paragraph_key(o): e for o, e in zip(old_original, old_english)}
+
+    paragraphs = split_segments(article_text)
+    changed = [i for i, p in enumerate(paragraphs) if paragraph_key(p) not in known]
+    if len(changed) > REUSE_MAX_CHANGED * len(paragraphs):
+        return None
+
+    lang_code, was_translated = previous["lang_code"], previous["was_translated"]
+    english = [known.get(paragraph_key(p)) for p in paragraphs]
+    changed_original = "\n\n".join(paragraphs[i] for i in changed)
+    if was_translated and changed:
+        for i, translated in zip(changed, translate_segments(changed_original, lang_code, "en",
+                                                             per_segment_detection=True)):
+            english[i] = translated
+    else:
+        for i in changed:
+            english[i] = paragraphs[i]
+
+    context = ArticleContext(
+        article_text,
+        translated_text="\n\n".join(english) if was_translated else None,
+        lang_code=lang_code,
+        lang_name=previous["lang_name"],
+        was_translated=was_translated,
+        title=title,
+        source=source,
+        url=url,
+    )
+    glossary = dict(previous["english_glossary"])
+    original_glossary = dict(previous["original_glossary"])
+    locations = list(previous["locations"])
+    entities = {label: list(names) for label, names in previous["entities"].items()}
+    if changed:
+        delta = ArticleContext(
+            changed_original,
+            translated_text="\n\n".join(english[i] for i in changed) if was_translated else None,
+            lang_code=lang_code,
+            was_translated=was_translated,
+        )
+        room = max(0, max_entities - len(glossary))
+        new_terms = {t: d for t, d in build_glossary(delta, max_entities=max_entities).items()
+                     if t not in glossary}
+        new_terms = dict(list(new_terms.items())[:room])
+        glossary.update(new_terms)
+        if was_translated and new_terms:
+            original_glossary.update(localize_insights("", new_terms, lang_code)[1])
+        else:
+            original_glossary.update(new_terms)
+        locations = sorted(set(locations) | set(extract_locations(delta)))
+        for label, names in delta.artifacts["entities"].items():
+            known_names = entities.setdefault(label, [])
+            known_names.extend(n for n in names if n not in known_names)
+
+    data = make_article_data(
+        context,
+        previous["english_summary"],
+        glossary,
+        locations,
+        previous["original_summary"],
+        original_glossary,
+        entities=entities,
+    )
+    data["reused"] = {"changed_paragraphs": len(changed), "paragraphs": len(paragraphs)}
+    return data
@@ -0,0 +1,40 @@
+class ArticleContext:
+    """
+    In-memory carrier for one article through the services: original and English text,
+    language metadata and the artifacts (analysis, summary, glossary, locations) derived from them.
+    """
+
+    def __init__(self, original_text, translated_text=None, lang_code="en", lang_name="English",
+                 was_translated=False, title=None, source=None, url=None):
+        self.original_text = original_text
+        self._translated = translated_text
+        self.lang_code = lang_code
+        self.lang_name = lang_name
+        self.was_translated = was_translated
+        self.title = title
+        self.source = source
+        self.url = url
+        self.artifacts = {}
+
+    @property
+    def translated_text(self):
+        """The English text the models run on (the original when no translation was needed)."""
+        return self.original_text if self._translated is None else self._translated
+
+    @property
+    def analysis(self):
+        """Shared spaCy analysis of the English text, parsed on first use."""
+        if "analysis" not in self.artifacts:
+            from components import model_client
+            self.artifacts["analysis"] = model_client.analyze(self.translated_text)
+        return self.artifacts["analysis"]
+
+
+def article_text(article):
+    """
+    Returns the English text of an ArticleContext, or the contents of a file path for older callers.
+    """
+    if isinstance(article, ArticleContext):
+        return article.translated_text
+    with open(article, 'r', encoding='utf-8') as f:
+        return f.read()
@@ -0,0 +1,417 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from components import metrics
+from components.glossary_cache import normalize_term
+from components.settings import cache_path
+
+# what an article is indexed under: the glossary's ranked people and organizations, and its locations
+INDEXED_LABELS = ("PERSON", "ORG", "GPE")
+# postings of new articles wait in sqlite (and are queried from there) until this many have
+# accumulated; they are then written out as one immutable segment
+FLUSH_POSTINGS = 5000
+# past this many segments the newest ones of comparable size are merged, so every posting is
+# rewritten only a logarithmic number of times as the index grows
+MAX_SEGMENTS = 8
+MERGE_RATIO = 2
+# co-occurrence counts look at the most recent articles mentioning the entity, at most this many
+COOCCURRENCE_ARTICLES = 2000
+
+# segment file: header | sorted term hashes (int64) | one _ENTRY per term | varint-encoded postings
+SEGMENT_MAGIC = b"EXPI"
+SEGMENT_VERSION = 1
+_HEADER = np.dtype([("magic", "S4"), ("version", "<u4"), ("terms", "<u8")])
+_ENTRY = np.dtype([("offset", "<u8"), ("nbytes", "<u4"), ("count", "<u4")])
+_EMPTY = np.zeros(0, dtype=np.int64)
+# sqlite caps the number of bound parameters per statement
+_SQL_CHUNK = 500
+
+
+def term_hash(label, name):
+    """64-bit key of an entity: its label and normalized name."""
+    digest = hashlib.blake2b(f"{label}\t{normalize_term(name)}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+def encode_varints(values):
+    """LEB128-encodes an array of unsigned ints; returns the bytes (uint8 array) and each value's length."""
+    values = values.astype(np.uint64)
+    lengths = np.ones(len(values), dtype=np.int64)
+    for k in range(1, 10):
+        lengths += values >= np.uint64(1 << (7 * k))
+    starts = np.cumsum(lengths) - lengths
+    position = np.arange(int(lengths.sum())) - np.repeat(starts, lengths)
+    out = ((np.repeat(values, lengths) >> (7 * position).astype(np.uint64)) & np.uint64(0x7F)).astype(np.uint8)
+    out[position < np.repeat(lengths, lengths) - 1] |= 0x80
+    return out, lengths
+
+
+def decode_varints(data):
+    """Inverse of encode_varints: the values of a uint8 array of LEB128 numbers."""
+    if not len(data):
+        return np.zeros(0, dtype=np.uint64)
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    position = np.arange(len(data)) - np.repeat(starts, ends - starts + 1)
+    parts = (data & 0x7F).astype(np.uint64) << (7 * position).astype(np.uint64)
+    return np.add.reduceat(parts, starts)
+
+
+def write_segment(path, terms, ids):
+    """
+    Writes (term, article id) postings as a segment file: per term, its sorted article ids
+    delta- and varint-encoded. Returns the number of postings written.
+    """
+    order = np.lexsort((ids, terms))
+    terms, ids = terms[order], ids[order]
+    keep = np.ones(len(terms), dtype=bool)
+    keep[1:] = (terms[1:] != terms[:-1]) | (ids[1:] != ids[:-1])
+    terms, ids = terms[keep], ids[keep]
+
+    first = np.ones(len(terms), dtype=bool)
+    first[1:] = terms[1:] != terms[:-1]
+    starts = np.flatnonzero(first)
+    counts = np.diff(np.append(starts, len(terms)))
+    deltas = ids.copy()
+    deltas[1:] -= ids[:-1]
+    deltas[starts] = ids[starts]
+    data, lengths = encode_varints(deltas)
+    byte_starts = np.cumsum(lengths) - lengths
+
+    entries = np.zeros(len(starts), dtype=_ENTRY)
+    entries["offset"] = byte_starts[starts]
+    entries["nbytes"] = np.add.reduceat(lengths, starts) if len(starts) else 0
+    entries["count"] = counts
+    header = np.array([(SEGMENT_MAGIC, SEGMENT_VERSION, len(starts))], dtype=_HEADER)
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        for part in (header, terms[starts].astype("<i8"), entries, data):
+            f.write(part.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return len(ids)
+
+
+class _Segment:
+    """A memory-mapped segment file; a lookup is a binary search over the term hashes."""
+
+    def __init__(self, path):
+        raw = np.memmap(path, dtype=np.uint8, mode="r")
+        header = raw[:_HEADER.itemsize].view(_HEADER)[0]
+        if header["magic"] != SEGMENT_MAGIC or header["version"] != SEGMENT_VERSION:
+            raise ValueError(f"{path} is not an article index segment (version {SEGMENT_VERSION})")
+        count = int(header["terms"])
+        offset = _HEADER.itemsize
+        self.terms = raw[offset:offset + 8 * count].view("<i8")
+        offset += 8 * count
+        self.entries = raw[offset:offset + _ENTRY.itemsize * count].view(_ENTRY)
+        self.data = raw[offset + _ENTRY.itemsize * count:]
+
+    def postings(self, term):
+        i = int(np.searchsorted(self.terms, term))
+        if i == len(self.terms) or self.terms[i] != term:
+            return _EMPTY
+        offset, nbytes, _ = self.entries[i].tolist()
+        return np.cumsum(decode_varints(self.data[offset:offset + nbytes])).astype(np.int64)
+
+    def pairs(self):
+        """Every (term, article id) posting, decoded at once for merging."""
+        counts = self.entries["count"].astype(np.int64)
+        deltas = decode_varints(self.data).astype(np.int64)
+        ids = np.cumsum(deltas)
+        # each term's list restarts from zero: subtract the running total reached before it
+        starts = np.cumsum(counts) - counts
+        ids -= np.repeat(ids[starts] - deltas[starts], counts)
+        return np.repeat(np.asarray(self.terms), counts), ids
+
+
+def _segment_name(first, last):
+    # the random suffix keeps concurrent merges of the same run (other processes) apart
+    return f"seg-{first:012d}-{last:012d}-{os.urandom(4).hex()}.idx"
+
+
+def _merge_run(rows):
+    """The newest run of segments in which no segment outweighs MERGE_RATIO times the rest of the run."""
+    sizes = [postings for _, _, _, postings in rows]
+    start = len(rows) - 2
+    while start > 0 and sizes[start - 1] <= MERGE_RATIO * sum(sizes[start:]):
+        start -= 1
+    return rows[start:]
+
+
+class ArticleIndex:
+    """
+    Persistent inverted index from entities (PERSON, ORG, GPE) to the analysed articles that mention
+    them, shared by every session and process on the host. Articles and entity names live in sqlite;
+    postings are appended there too and, once FLUSH_POSTINGS have accumulated, written out as an
+    immutable, memory-mapped segment of delta/varint-compressed article id lists. Later flushes merge
+    the newest segments; the index is never rebuilt as a whole. Article ids grow with indexing time,
+    so the newest articles are at the end of every list.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or cache_path("article_index")
+        os.makedirs(self.path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._segments = {}
+        self._conn = sqlite3.connect(os.path.join(self.path, "index.sqlite3"), check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " result_key TEXT NOT NULL UNIQUE,"
+                " url TEXT NOT NULL,"
+                " title TEXT,"
+                " source TEXT,"
+                " added_at REAL NOT NULL,"
+                " terms BLOB NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS articles_added ON articles(added_at)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS terms ("
+                " term INTEGER PRIMARY KEY,"
+                " label TEXT NOT NULL,"
+                " name TEXT NOT NULL,"
+                " norm TEXT NOT NULL,"
+                " articles INTEGER NOT NULL,"
+                " last_seen REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS terms_norm ON terms(norm)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS pending (term INTEGER NOT NULL, article_id INTEGER NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS pending_term ON pending(term)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS segments ("
+                " file TEXT PRIMARY KEY,"
+                " first_article INTEGER NOT NULL,"
+                " last_article INTEGER NOT NULL,"
+                " postings INTEGER NOT NULL)"
+            )
+
+    def add(self, result_key, url, title, terms, source=None):
+        """
+        Indexes an article under its (label, name) terms. Returns its article id, or None when the
+        result key is already indexed.
+        """
+        named = {}
+        for label, name in terms:
+            if name and name.strip():
+                named.setdefault(term_hash(label, name), (label, name.strip()))
+        hashes = np.array(sorted(named), dtype="<i8")
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO articles (result_key, url, title, source, added_at, terms)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (result_key, url, title, source, now, hashes.tobytes()),
+            )
+            if not cursor.rowcount:
+                return None
+            article_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO terms (term, label, name, norm, articles, last_seen) VALUES (?, ?, ?, ?, 1, ?)"
+                " ON CONFLICT(term) DO UPDATE SET articles = articles + 1, last_seen = excluded.last_seen",
+                [(h, label, name, normalize_term(name), now) for h, (label, name) in named.items()],
+            )
+            self._conn.executemany("INSERT INTO pending (term, article_id) VALUES (?, ?)",
+                                   [(int(h), article_id) for h in hashes])
+            pending = self._conn.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+        metrics.incr("article_index.add")
+        if pending >= FLUSH_POSTINGS:
+            self.flush()
+        return article_id
+
+    def add_article(self, result_key, url, article_data):
+        """Indexes an article_data dict (see article_terms)."""
+        return self.add(result_key, url, article_data.get("title"), article_terms(article_data),
+                        source=article_data.get("source"))
+
+    def flush(self):
+        """Writes the pending postings out as a new segment, then merges segments if there are too many."""
+        with metrics.timed("article_index.flush"), self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            rows = self._conn.execute("SELECT term, article_id FROM pending").fetchall()
+            if rows:
+                pairs = np.array(rows, dtype=np.int64)
+                first, last = int(pairs[:, 1].min()), int(pairs[:, 1].max())
+                name = _segment_name(first, last)
+                count = write_segment(os.path.join(self.path, name), pairs[:, 0], pairs[:, 1])
+                self._conn.execute("INSERT INTO segments (file, first_article, last_article, postings)"
+                                   " VALUES (?, ?, ?, ?)", (name, first, last, count))
+                self._conn.execute("DELETE FROM pending")
+        while self.compact():
+            pass
+
+    def compact(self, full=False):
+        """
+        Merges the newest similar-sized segments (all of them with full=True) into one, when there
+        are more than MAX_SEGMENTS. Returns whether a merge happened.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT file, first_article, last_article, postings FROM segments ORDER BY first_article"
+            ).fetchall()
+        if len(rows) < 2 or (not full and len(rows) <= MAX_SEGMENTS):
+            return False
+        run = rows if full else _merge_run(rows)
+
+        try:
+            with self._lock:
+                segments = [self._segment(file) for file, _, _, _ in run]
+        except FileNotFoundError:
+            return False  # another process merged and removed one of them since the rows were read
+        with metrics.timed("article_index.merge"):
+            terms, ids = zip(*(segment.pairs() for segment in segments))
+            name = _segment_name(run[0][1], run[-1][2])
+            count = write_segment(os.path.join(self.path, name), np.concatenate(terms), np.concatenate(ids))
+
+        files = [file for file, _, _, _ in run]
+        marks = ",".join("?" * len(files))
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            merged = self._conn.execute(f"SELECT COUNT(*) FROM segments WHERE file IN ({marks})", files).fetchone()[0]
+            if merged == len(files):
+                self._conn.execute(f"DELETE FROM segments WHERE file IN ({marks})", files)
+                self._conn.execute("INSERT INTO segments (file, first_article, last_article, postings)"
+                                   " VALUES (?, ?, ?, ?)", (name, run[0][1], run[-1][2], count))
+        # another process merged (part of) the same run first; its result stands
+        obsolete = files if merged == len(files) else [name]
+        with self._lock:
+            for file in obsolete:
+                self._segments.pop(file, None)
+        for file in obsolete:
+            try:
+                os.remove(os.path.join(self.path, file))
+            except OSError:
+                pass  # still mapped elsewhere (Windows); harmless, it is no longer listed
+        return merged == len(files)
+
+    def _segment(self, file):
+        segment = self._segments.get(file)
+        if segment is None:
+            segment = self._segments[file] = _Segment(os.path.join(self.path, file))
+        return segment
+
+    def postings(self, term):
+        """Ids of the articles indexed under a term_hash, oldest first."""
+        for attempt in range(3):
+            with self._lock, self._conn:
+                # one read transaction, so a concurrent flush cannot move postings between the two reads
+                self._conn.execute("BEGIN")
+                files = [row[0] for row in self._conn.execute("SELECT file FROM segments ORDER BY first_article")]
+                pending = self._conn.execute(
+                    "SELECT article_id FROM pending WHERE term = ? ORDER BY article_id", (term,)).fetchall()
+                try:
+                    segments = [self._segment(file) for file in files]
+                except FileNotFoundError:
+                    if attempt == 2:
+                        raise
+                    continue  # merged away by another process meanwhile; read the new list
+                for file in set(self._segments) - set(files):
+                    del self._segments[file]
+            parts = [segment.postings(term) for segment in segments]
+            parts.append(np.array([row[0] for row in pending], dtype=np.int64))
+            return np.concatenate(parts)
+
+    def _article_ids(self, name, label=None, since=None):
+        labels = [label] if label else INDEXED_LABELS
+        with metrics.timed("article_index.lookup"):
+            ids = [self.postings(term_hash(l, name)) for l in labels]
+            ids = ids[0] if len(ids) == 1 else np.unique(np.concatenate(ids))
+        if since is not None:
+            with self._lock:
+                first = self._conn.execute("SELECT MIN(id) FROM articles WHERE added_at >= ?", (since,)).fetchone()[0]
+            ids = ids[ids >= first] if first is not None else _EMPTY
+        return ids
+
+    def _select(self, query, ids):
+        rows = []
+        with self._lock:
+            for i in range(0, len(ids), _SQL_CHUNK):
+                chunk = [int(x) for x in ids[i:i + _SQL_CHUNK]]
+                rows += self._conn.execute(query.format(marks=",".join("?" * len(chunk))), chunk).fetchall()
+        return rows
+
+    def articles_mentioning(self, name, label=None, since=None, limit=20):
+        """
+        The most recently indexed articles that mention an entity (any indexed label unless given),
+        newest first, as dicts with id, url, title, source and added_at. `since` is a Unix time.
+        """
+        ids = self._article_ids(name, label, since)[::-1][:limit]
+        rows = self._select("SELECT id, url, title, source, added_at FROM articles WHERE id IN ({marks})", ids)
+        by_id = {row[0]: row for row in rows}
+        return [dict(zip(("id", "url", "title", "source", "added_at"), by_id[int(i)])) for i in ids if int(i) in by_id]
+
+    def cooccurring(self, name, label=None, since=None, top_n=10, max_articles=COOCCURRENCE_ARTICLES):
+        """
+        Entities most often mentioned in the same articles as this one, over its max_articles most
+        recent articles: dicts with label, name and articles (the number shared).
+        """
+        ids = self._article_ids(name, label, since)[-max_articles:]
+        blobs = self._select("SELECT terms FROM articles WHERE id IN ({marks})", ids)
+        if not blobs:
+            return []
+        terms = np.concatenate([np.frombuffer(blob, dtype="<i8") for blob, in blobs])
+        own = [term_hash(l, name) for l in ([label] if label else INDEXED_LABELS)]
+        terms = terms[~np.isin(terms, own)]
+        unique, counts = np.unique(terms, return_counts=True)
+        top = np.argsort(-counts, kind="stable")[:top_n]
+        names = {term: (l, n) for term, l, n in self._select(
+            "SELECT term, label, name FROM terms WHERE term IN ({marks})", unique[top])}
+        return [{"label": names[int(unique[i])][0], "name": names[int(unique[i])][1], "articles": int(counts[i])}
+                for i in top if int(unique[i]) in names]
+
+    def find_terms(self, text, limit=20):
+        """Indexed entities whose name contains the text, most widely mentioned first."""
+        pattern = "%" + normalize_term(text).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT label, name, articles FROM terms WHERE norm LIKE ? ESCAPE '\\'"
+                " ORDER BY articles DESC, last_seen DESC LIMIT ?", (pattern, limit)).fetchall()
+        return [{"label": label, "name": name, "articles": count} for label, name, count in rows]
+
+    def stats(self):
+        with self._lock:
+            articles = self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+            terms = self._conn.execute("SELECT COUNT(*) FROM terms").fetchone()[0]
+            segments, postings = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(postings), 0) FROM segments").fetchone()
+            pending = self._conn.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+            files = [row[0] for row in self._conn.execute("SELECT file FROM segments")]
+        return {
+            "articles": articles,
+            "terms": terms,
+            "segments": segments,
+            "postings": postings + pending,
+            "pending": pending,
+            "segment_bytes": sum(os.path.getsize(os.path.join(self.path, f)) for f in files
+                                 if os.path.exists(os.path.join(self.path, f))),
+        }
+
+
+def article_terms(article_data):
+    """(label, name) terms an article_data dict is indexed under: its ranked people and organizations, and its locations."""
+    entities = article_data.get("entities") or {}
+    terms = [(label, name) for label in ("PERSON", "ORG") for name in entities.get(label, [])]
+    terms += [("GPE", name) for name in article_data.get("locations", [])]
+    return terms
+
+
+_article_index = None
+_article_index_lock = threading.Lock()
+
+
+def get_article_index():
+    """Process-wide ArticleIndex instance."""
+    global _article_index
+    with _article_index_lock:
+        if _article_index is None:
+            _article_index = ArticleIndex()
+        return _article_index
@@ -1,27 +1,39 @@
 # helper/article_processor.py
 
-import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse
-from components.translation.translator import detect_language, translate_text
-from components.translation.language_map import LANGUAGE_CODE_TO_NAME
-from services.file_handler import write_temp_file
+from components import metrics
+from components.html_extractor import extract as extract_html
+from components.translation.translator import detect_language, get_language_name, translate_text
+from services.article_context import ArticleContext
+from services.fetcher import get_fetcher
 
-def fetch_and_process_article(url, translation_enabled=True):
-    try:
-        response = requests.get(url, timeout=10)
-        soup = BeautifulSoup(response.content, "html.parser")
+def extract_article(html):
+    """
+    Returns (title, article_text) of a page: the paragraphs kept by the extraction engine joined by "\n\n".
+    """
+    with metrics.timed("extract"):
+        article = extract_html(html)
+    metrics.observe("article.chars", len(article.text))
+    metrics.observe("extract.dropped_bytes", max(article.html_bytes - article.text_bytes, 0))
+    return article.title, article.text
 
-        # Extract title
-        title = soup.title.string.strip() if soup.title else "No title found"
+def fetch_article(url, timeout=30):
+    """
+    Downloads the page through the shared pooled/caching fetcher and returns (title, article_text).
+    """
+    with metrics.timed("fetch"):
+        result = get_fetcher().fetch(url, timeout=timeout)
+    metrics.observe("fetch.html_bytes", len(result.content))
+    return extract_article(result.content)
 
-        # Extract article text
-        paragraphs = soup.find_all("p")
-        article_text = "\n\n".join(p.get_text().strip() for p in paragraphs if p.get_text().strip())
+def fetch_and_process_article(url, translation_enabled=True):
+    try:
+        # Extract title and article text
+        title, article_text = fetch_article(url, timeout=10)
 
         # Language detection
         detected_lang = detect_language(article_text)
-        detected_lang_full = LANGUAGE_CODE_TO_NAME.get(detected_lang, "Unknown")
+        detected_lang_full = get_language_name(detected_lang)
 
         translated_text = article_text
         translated = False
@@ -31,12 +43,21 @@ def fetch_and_process_article(url, translation_enabled=True):
             translated_text = translate_text(article_text, src_lang=detected_lang, target_lang="en")
             translated = True
 
-        # Save translated or original content to temp file
-        temp_file_path = write_temp_file(translated_text)
-
         # Extract domain
         source = urlparse(url).netloc
 
+        # Carry the texts to the next stages in memory
+        context = ArticleContext(
+            article_text,
+            translated_text=translated_text if translated else None,
+            lang_code=detected_lang,
+            lang_name=detected_lang_full,
+            was_translated=translated,
+            title=title,
+            source=source,
+            url=url,
+        )
+
         return {
             "title": title,
             "article_text": article_text,
@@ -45,7 +66,7 @@ def fetch_and_process_article(url, translation_enabled=True):
             "language_code": detected_lang,
             "language_full": detected_lang_full,
             "translated": translated,
-            "temp_file_path": temp_file_path
+            "context": context
         }
 
     except Exception as e:
@@ -0,0 +1,150 @@
+import os
+import threading
+import weakref
+import zlib
+
+from components import metrics
+
+# the large fields of article_data; everything else is small and kept decoded
+CONTENT_FIELDS = ("english_content", "original_content")
+# paragraphs are packed into blocks of about this many characters, each compressed on its own,
+# so rendering decodes one block at a time
+BLOCK_CHARS = 32 * 1024
+COMPRESS = os.environ.get("EXPLAINEE_ARTIFACT_COMPRESSION", "1") != "0"
+COMPRESS_LEVEL = 6
+
+
+def _pack(paragraphs, compress):
+    blocks, current, size = [], [], 0
+    for paragraph in paragraphs:
+        current.append(paragraph)
+        size += len(paragraph)
+        if size >= BLOCK_CHARS:
+            blocks.append(current)
+            current, size = [], 0
+    if current:
+        blocks.append(current)
+    packed = []
+    for block in blocks:
+        raw = "\n\n".join(block).encode("utf-8")
+        packed.append(zlib.compress(raw, COMPRESS_LEVEL) if compress else raw)
+    return packed
+
+
+class _StoredArticle:
+    def __init__(self, article_data, compress):
+        self.meta = {k: v for k, v in article_data.items() if k not in CONTENT_FIELDS}
+        self.compressed = compress
+        self.content = {}
+        for field in CONTENT_FIELDS:
+            text = article_data.get(field) or ""
+            # an untranslated article has the same text in both fields; it is stored once
+            same = next((f for f in self.content if (article_data.get(f) or "") == text), None)
+            self.content[field] = self.content[same] if same else _pack(text.split("\n\n") if text else [], compress)
+        self.refs = 0
+
+    @property
+    def nbytes(self):
+        unique = {id(blocks): blocks for blocks in self.content.values()}
+        return sum(len(block) for blocks in unique.values() for block in blocks)
+
+
+class ArticleHandle:
+    """
+    What a session keeps instead of article_data: a key into the ArtifactStore. The shared entry
+    lives while any handle to it does; dropping the handle (a new analysis, an ended session)
+    releases it.
+    """
+
+    __slots__ = ("key", "_entry", "__weakref__")
+
+    def __init__(self, key, entry):
+        self.key = key
+        self._entry = entry
+
+    @property
+    def meta(self):
+        """The small article_data fields (title, summaries, glossaries, ...); shared, so treat as read-only."""
+        return self._entry.meta
+
+    def paragraphs(self, field):
+        """Yields the paragraphs of a content field, decoding one block at a time."""
+        for block in self._entry.content[field]:
+            raw = zlib.decompress(block) if self._entry.compressed else block
+            yield from raw.decode("utf-8").split("\n\n")
+
+    def text(self, field):
+        return "\n\n".join(self.paragraphs(field))
+
+    def article_data(self):
+        """The full article_data dict, decoded (for the result cache or export)."""
+        data = dict(self.meta)
+        for field in CONTENT_FIELDS:
+            data[field] = self.text(field)
+        return data
+
+
+class ArtifactStore:
+    """
+    Process-wide store of analysed articles shared by all sessions. Entries are keyed like the
+    ResultCache (URL, text hash, pipeline version), so sessions viewing the same article share one
+    copy; the article text is kept in compressed blocks. Entries are reference-counted by their
+    handles and dropped when the last handle goes away.
+    """
+
+    def __init__(self, compress=COMPRESS):
+        self.compress = compress
+        self._entries = {}
+        # re-entrant: a GC pass while _handle allocates under the lock can run a handle's
+        # finalizer (_release) on this same thread
+        self._lock = threading.RLock()
+
+    def _handle(self, key, entry):
+        entry.refs += 1
+        handle = ArticleHandle(key, entry)
+        weakref.finalize(handle, self._release, key, entry)
+        return handle
+
+    def get(self, key):
+        """Returns a new handle to the stored article, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            metrics.incr("artifact_store.hit")
+            return self._handle(key, entry)
+
+    def put(self, key, article_data):
+        """Stores the article (unless it is already stored) and returns a handle to it."""
+        entry = _StoredArticle(article_data, self.compress)
+        with self._lock:
+            entry = self._entries.setdefault(key, entry)
+            return self._handle(key, entry)
+
+    def _release(self, key, entry):
+        with self._lock:
+            entry.refs -= 1
+            if entry.refs <= 0 and self._entries.get(key) is entry:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            entries = list(self._entries.values())
+        return {
+            "articles": len(entries),
+            "handles": sum(e.refs for e in entries),
+            "bytes": sum(e.nbytes for e in entries),
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store():
+    """Process-wide ArtifactStore, shared by every Streamlit session in the worker."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore()
+        return _store
@@ -0,0 +1,176 @@
+import asyncio
+import sqlite3
+import threading
+import time
+import zlib
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from components import metrics
+from components.settings import cache_path
+
+# bodies larger than this are refused instead of being downloaded in full
+MAX_BODY_BYTES = 8 * 1024 * 1024
+CHUNK_BYTES = 64 * 1024
+POOL_HOSTS = 32
+POOL_PER_HOST = 8
+DEFAULT_TIMEOUT = 30
+USER_AGENT = "Mozilla/5.0 (compatible; Explainee/1.0; +https://github.com/rishabh-agr1/Explainee)"
+
+HTTP_CACHE_MAX_ENTRIES = 2000
+
+
+class FetchError(RuntimeError):
+    pass
+
+
+class FetchResult:
+    def __init__(self, url, status_code, content, headers, from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.from_cache = from_cache
+
+
+class HttpCache:
+    """
+    sqlite store of page bodies with their validators (ETag / Last-Modified), used to make
+    conditional requests and to answer a 304 from disk. Least recently used pages are evicted.
+    """
+
+    def __init__(self, path=None, max_entries=HTTP_CACHE_MAX_ENTRIES):
+        self.path = path or cache_path("http.sqlite3")
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                " url TEXT PRIMARY KEY,"
+                " etag TEXT,"
+                " last_modified TEXT,"
+                " content_type TEXT,"
+                " body BLOB NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+
+    def get(self, url):
+        """Returns {"etag", "last_modified", "content_type", "body"} or None."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, content_type, body FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url))
+        etag, last_modified, content_type, body = row
+        return {"etag": etag, "last_modified": last_modified, "content_type": content_type,
+                "body": zlib.decompress(body)}
+
+    def put(self, url, etag, last_modified, content_type, body):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, content_type, body, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, content_type, zlib.compress(body), time.time()),
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM pages WHERE url IN (SELECT url FROM pages ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    def discard(self, url):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+
+
+class Fetcher:
+    """
+    Article downloader on one pooled requests.Session (keep-alive per host), with a streaming
+    body size cap and conditional GETs against the HttpCache.
+    """
+
+    def __init__(self, max_bytes=MAX_BODY_BYTES, http_cache=None, timeout=DEFAULT_TIMEOUT):
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.http_cache = http_cache if http_cache is not None else HttpCache()
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_PER_HOST)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _read_body(self, response, url):
+        declared = response.headers.get("Content-Length")
+        if declared and declared.isdigit() and int(declared) > self.max_bytes:
+            raise FetchError(f"{url} is {int(declared)} bytes, above the {self.max_bytes}-byte limit")
+        chunks, size = [], 0
+        for chunk in response.iter_content(CHUNK_BYTES):
+            size += len(chunk)
+            if size > self.max_bytes:
+                raise FetchError(f"{url} is larger than the {self.max_bytes}-byte limit")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def fetch(self, url, timeout=None):
+        cached = self.http_cache.get(url) if self.http_cache else None
+        headers = {}
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        with self.session.get(url, headers=headers, stream=True, timeout=timeout or self.timeout) as response:
+            if response.status_code == 304 and cached:
+                metrics.incr("fetch.not_modified")
+                return FetchResult(url, 304, cached["body"], {"Content-Type": cached["content_type"]}, from_cache=True)
+            response.raise_for_status()
+            body = self._read_body(response, url)
+            response_headers = dict(response.headers)
+
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if self.http_cache:
+            if etag or last_modified:
+                self.http_cache.put(url, etag, last_modified, response_headers.get("Content-Type"), body)
+            elif cached:
+                self.http_cache.discard(url)
+        return FetchResult(url, response.status_code, body, response_headers)
+
+    async def fetch_async(self, url, timeout=None):
+        return await asyncio.to_thread(self.fetch, url, timeout)
+
+    async def fetch_many(self, urls, concurrency=8, timeout=None):
+        """
+        Fetches the URLs concurrently (at most `concurrency` in flight) on the shared session.
+        Returns one FetchResult or exception per URL, in input order.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(url):
+            async with semaphore:
+                return await self.fetch_async(url, timeout)
+
+        return await asyncio.gather(*(one(url) for url in urls), return_exceptions=True)
+
+    def close(self):
+        self.session.close()
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher():
+    """Process-wide Fetcher, so every request reuses the same connection pool."""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = Fetcher()
+        return _fetcher
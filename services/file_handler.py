@@ -3,13 +3,14 @@ import tempfile
 import os
 import atexit
 
-_temp_files = []
+_temp_files = set()
 
 def write_temp_file(content):
     temp_file = tempfile.NamedTemporaryFile(delete=False, mode='w+', encoding='utf-8', suffix='.txt')
-    temp_file.write(content)
-    temp_file.flush()
-    _temp_files.append(temp_file.name)
+    with temp_file:
+        temp_file.write(content)
+        temp_file.flush()
+    _temp_files.add(temp_file.name)
     return temp_file.name
 
 def read_temp_file(path):
@@ -17,17 +18,15 @@ def read_temp_file(path):
         return f.read()
 
 def delete_temp_file(path):
+    _temp_files.discard(path)
     try:
         os.remove(path)
     except Exception:
         pass
 
 def cleanup_all_temp_files():
-    for file in _temp_files:
-        try:
-            os.remove(file)
-        except Exception:
-            pass
+    for file in list(_temp_files):
+        delete_temp_file(file)
 
 # Automatically clean up all temp files at exit
 atexit.register(cleanup_all_temp_files)
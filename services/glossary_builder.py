@@ -1,23 +1,32 @@
-from components.extractor import extract_named_entities
-from components.explainer import get_glossary_definitions
+from components.entity_index import EntityIndex
+from components.extractor import analyze_text
+from components.explainer import lookup_glossary
+from services.article_context import ArticleContext, article_text
 
-def build_glossary(file_path, max_entities=15):
+def build_glossary(article, max_entities=15, analysis=None, deadline=None):
     """
-    Extracts PERSON and ORG entities from the article and returns a glossary (up to max_entities terms).
+    Extracts PERSON and ORG entities from the article and returns a glossary of the max_entities most
+    prominent ones, in rank order.
+    `article` is an ArticleContext, whose shared analysis is reused, or a path to a text file.
+    Wikipedia lookups unfinished at `deadline` (time.monotonic()) are left out and, for an
+    ArticleContext, listed in artifacts["glossary_skipped"]; the ranked names themselves, defined
+    or not, go to artifacts["entities"] as {"PERSON": [...], "ORG": [...]}.
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        article_text = f.read()
+    if analysis is None:
+        if isinstance(article, ArticleContext):
+            analysis = article.analysis
+        else:
+            analysis = analyze_text(article_text(article))
 
-    named_entities = extract_named_entities(article_text)
-    persons = named_entities.get("PERSON", [])
-    orgs = named_entities.get("ORG", [])
+    # top-K canonical entities by prominence, so aliases ("Modi", "Narendra Modi") cost one lookup
+    top_entities = EntityIndex.from_analysis(analysis).top(max_entities)
+    persons = [e.name for e in top_entities if e.label == "PERSON"]
+    orgs = [e.name for e in top_entities if e.label == "ORG"]
 
-    combined = persons + orgs
-    top_entities = combined[:max_entities]
-
-    # Partition back to persons and orgs
-    filtered_persons = [e for e in top_entities if e in persons]
-    filtered_orgs = [e for e in top_entities if e in orgs]
-
-    glossary = get_glossary_definitions(filtered_persons, filtered_orgs)
+    definitions, skipped = lookup_glossary(persons, orgs, deadline=deadline)
+    glossary = {e.name: definitions[e.name] for e in top_entities if e.name in definitions}
+    if isinstance(article, ArticleContext):
+        article.artifacts["glossary"] = glossary
+        article.artifacts["glossary_skipped"] = skipped
+        article.artifacts["entities"] = {"PERSON": persons, "ORG": orgs}
     return glossary
@@ -1,20 +1,32 @@
-from components.translation.translator import detect_language, get_language_name, translate_to_english
-from services.file_handler import write_temp_file
+from components import metrics
+from components.translation.translator import detect_language_with_confidence, get_language_name, translate_to_english
+from services.article_context import ArticleContext
 
-def handle_language_pipeline(article_text):
+def handle_language_pipeline(article_text, title=None, source=None, url=None):
     """
-    Detects language, translates to English (if needed), and writes the result to a temp file.
-    Returns:
-        - language_code
-        - language_name
-        - translated_path
-        - was_translated (bool)
+    Detects language and translates to English (if needed).
+    Returns an ArticleContext carrying the original text, the English text and the language metadata
+    (lang_code, lang_name, was_translated).
     """
-    lang_code = detect_language(article_text)
+    with metrics.timed("language.detect"):
+        lang_code, confidence = detect_language_with_confidence(article_text)
     lang_name = get_language_name(lang_code)
 
     was_translated = lang_code != "en"
-    translated_text = translate_to_english(article_text, lang_code) if was_translated else article_text
-    translated_path = write_temp_file(translated_text)
+    translated_text = None
+    if was_translated:
+        with metrics.timed("language.translate"):
+            translated_text = translate_to_english(article_text, lang_code)
 
-    return lang_code, lang_name, translated_path, was_translated
+    context = ArticleContext(
+        article_text,
+        translated_text=translated_text,
+        lang_code=lang_code,
+        lang_name=lang_name,
+        was_translated=was_translated,
+        title=title,
+        source=source,
+        url=url,
+    )
+    context.artifacts["lang_confidence"] = confidence
+    return context
@@ -0,0 +1,20 @@
+from components.translation.translator import translate_segments
+
+def localize_insights(summary, glossary, dest_lang):
+    """
+    Translates the English summary and glossary definitions into dest_lang in one batched call
+    (paragraphs go through the translation pool and memory). Glossary terms are kept as they are.
+    Returns (summary, glossary).
+    """
+    if dest_lang in ("en", "unknown") or (not summary and not glossary):
+        return summary, glossary
+
+    terms = list(glossary)
+    # one segment per item: blank lines inside an item would split it in two
+    items = [summary] + [glossary[term] for term in terms]
+    items = ["\n".join(item.split("\n\n")) for item in items]
+    translated = list(translate_segments("\n\n".join(items), "en", dest_lang))
+    if len(translated) != len(items):
+        return summary, glossary
+
+    return translated[0], dict(zip(terms, translated[1:]))
@@ -1,11 +1,18 @@
-from components.extractor import extract_named_entities
+from components.extractor import analyze_text
+from services.article_context import ArticleContext, article_text
 
-def extract_locations(file_path):
+def extract_locations(article, analysis=None):
     """
     Extracts and returns a list of GPE (geopolitical) entities from the article.
+    `article` is an ArticleContext, whose shared analysis is reused, or a path to a text file.
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        article_text = f.read()
+    if analysis is None:
+        if isinstance(article, ArticleContext):
+            analysis = article.analysis
+        else:
+            analysis = analyze_text(article_text(article))
 
-    named_entities = extract_named_entities(article_text)
-    return sorted(set(named_entities.get("GPE", [])))
+    locations = sorted(set(analysis.entities_by_label("GPE")))
+    if isinstance(article, ArticleContext):
+        article.artifacts["locations"] = locations
+    return locations
@@ -0,0 +1,168 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from components import metrics
+from components.settings import cache_path
+from services.result_cache import ANALYSIS_VERSION
+
+# word 5-gram shingles, 128 MinHash permutations split into 16 LSH bands of 8 rows: pairs above
+# ~0.7 Jaccard similarity share a band with high probability, and candidates are then checked
+# against DUPLICATE_THRESHOLD on the full signature
+SHINGLE_WORDS = 5
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+DUPLICATE_THRESHOLD = 0.8
+MAX_CANDIDATES = 50
+# fixed so that signatures stay comparable across processes and restarts
+PERMUTATION_SEED = 1
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+_rng = np.random.RandomState(PERMUTATION_SEED)
+_PERM_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text):
+    """crc32 hashes of the lowercased word n-grams of the text."""
+    words = _WORD.findall(text.lower())
+    if len(words) <= SHINGLE_WORDS:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))} if words else set()
+    return {zlib.crc32(" ".join(words[i:i + SHINGLE_WORDS]).encode("utf-8"))
+            for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def minhash(text):
+    """MinHash signature (NUM_PERM uint32 values) of the text's shingle set."""
+    hashes = np.fromiter(shingles(text), dtype=np.uint64)
+    if hashes.size == 0:
+        return np.full(NUM_PERM, _MAX_HASH, dtype=np.uint32)
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of the two texts behind the signatures."""
+    return float(np.mean(signature == other))
+
+
+def paragraph_key(paragraph):
+    """Whitespace- and case-insensitive hash of one paragraph."""
+    return hashlib.sha1(" ".join(paragraph.lower().split()).encode("utf-8")).hexdigest()[:16]
+
+
+def _band_buckets(signature):
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS].tobytes()
+        digest = hashlib.blake2b(bytes([band]) + rows, digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, "big", signed=True))
+    return buckets
+
+
+class DuplicateMatch:
+    def __init__(self, doc_id, url, result_key, similarity):
+        self.doc_id = doc_id
+        self.url = url
+        self.result_key = result_key
+        self.similarity = similarity
+
+
+class DuplicateIndex:
+    """
+    Persistent MinHash/LSH index over the extracted text of analysed articles, used to recognise
+    syndicated copies of a story. Each article stores its signature and one row per LSH band
+    bucket; a lookup probes BANDS indexed buckets and compares the few candidates' signatures.
+    Entries point at the article's ResultCache key and record the ANALYSIS_VERSION it was made
+    with; entries from other versions are never matched, just as the ResultCache ignores them.
+    """
+
+    def __init__(self, path=None, threshold=DUPLICATE_THRESHOLD, version=ANALYSIS_VERSION):
+        self.path = path or cache_path("near_duplicates.sqlite3")
+        self.threshold = threshold
+        self.version = version
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS docs ("
+                " id INTEGER PRIMARY KEY,"
+                " url TEXT NOT NULL,"
+                " result_key TEXT NOT NULL UNIQUE,"
+                " signature BLOB NOT NULL,"
+                " added_at REAL NOT NULL,"
+                " version TEXT NOT NULL DEFAULT '')"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(docs)")}
+            if "version" not in columns:
+                # indexes made before versions were recorded match no version
+                self._conn.execute("ALTER TABLE docs ADD COLUMN version TEXT NOT NULL DEFAULT ''")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS buckets (bucket INTEGER NOT NULL, doc_id INTEGER NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS buckets_bucket ON buckets(bucket)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS buckets_doc ON buckets(doc_id)")
+
+    def add(self, url, text, result_key, signature=None):
+        signature = minhash(text) if signature is None else signature
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO docs (url, result_key, signature, added_at, version) VALUES (?, ?, ?, ?, ?)",
+                (url, result_key, signature.tobytes(), time.time(), self.version),
+            )
+            if cursor.rowcount:
+                self._conn.executemany(
+                    "INSERT INTO buckets (bucket, doc_id) VALUES (?, ?)",
+                    [(bucket, cursor.lastrowid) for bucket in _band_buckets(signature)],
+                )
+
+    def find(self, text, signature=None):
+        """Returns the most similar indexed article at or above the threshold, as a DuplicateMatch, or None."""
+        signature = minhash(text) if signature is None else signature
+        buckets = _band_buckets(signature)
+        with metrics.timed("near_duplicates.lookup"), self._lock:
+            rows = self._conn.execute(
+                "SELECT d.id, d.url, d.result_key, d.signature FROM docs d WHERE d.id IN ("
+                " SELECT DISTINCT b.doc_id FROM buckets b JOIN docs v ON v.id = b.doc_id"
+                f" WHERE b.bucket IN ({','.join('?' * len(buckets))}) AND v.version = ?"
+                " LIMIT ?)",
+                (*buckets, self.version, MAX_CANDIDATES),
+            ).fetchall()
+
+        best = None
+        for doc_id, url, result_key, blob in rows:
+            score = similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+            if score >= self.threshold and (best is None or score > best.similarity):
+                best = DuplicateMatch(doc_id, url, result_key, score)
+        metrics.incr("near_duplicates.hit" if best else "near_duplicates.miss")
+        return best
+
+    def discard(self, doc_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM buckets WHERE doc_id = ?", (doc_id,))
+            self._conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+
+_duplicate_index = None
+_duplicate_index_lock = threading.Lock()
+
+
+def get_duplicate_index():
+    """Process-wide DuplicateIndex instance."""
+    global _duplicate_index
+    with _duplicate_index_lock:
+        if _duplicate_index is None:
+            _duplicate_index = DuplicateIndex()
+        return _duplicate_index
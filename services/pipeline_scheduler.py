@@ -0,0 +1,153 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FutureTimeout
+
+from components import metrics
+
+# network-bound stages (Wikipedia, translation) share a thread pool per run
+IO = "io"
+IO_WORKERS = 4
+# process-wide pool for IO calls made through run_with_deadline (e.g. to a model server), shared by all sessions
+SHARED_IO_WORKERS = 16
+
+# every other lane name ("summarizer", "spacy", ...) is a dedicated, process-wide single model thread:
+# calls into one model are serialized across sessions while different models run side by side
+_lanes = {}
+_lanes_lock = threading.Lock()
+
+
+class StageSkipped(Exception):
+    """Raised in place of a stage's result when one of its dependencies failed."""
+
+
+class Stage:
+    """
+    One pipeline step. `func` is called with the results of `deps` as positional arguments,
+    on the IO pool or on the named model lane.
+    """
+
+    def __init__(self, name, func, deps=(), lane=IO):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.lane = lane
+
+
+class StageResult:
+    def __init__(self, name, value=None, error=None, seconds=0.0):
+        self.name = name
+        self.value = value
+        self.error = error
+        self.seconds = seconds
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _lane_executor(lane):
+    with _lanes_lock:
+        executor = _lanes.get(lane)
+        if executor is None:
+            workers = SHARED_IO_WORKERS if lane == IO else 1
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"lane-{lane}")
+            _lanes[lane] = executor
+        return executor
+
+
+def run_with_deadline(func, deadline, lane=IO):
+    """
+    Runs func() on the lane (a shared pool for IO) and waits for it until `deadline`, a time.monotonic()
+    value (None: no limit). Returns (True, value), or (False, None) when it did not finish in time; a
+    call still queued behind other work is cancelled, one already running finishes in the background.
+    """
+    executor = _lane_executor(lane)
+    future = executor.submit(metrics.run_in_context(func))
+    timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+    try:
+        return True, future.result(timeout)
+    except FutureTimeout:
+        future.cancel()
+        metrics.incr(f"deadline.missed.{lane}")
+        return False, None
+
+
+def _check_graph(stages):
+    by_name = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate stage {stage.name!r}")
+        by_name[stage.name] = stage
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in by_name:
+                raise ValueError(f"Stage {stage.name!r} depends on unknown stage {dep!r}")
+
+    visiting, done = set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle through stage {name!r}")
+        visiting.add(name)
+        for dep in by_name[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in by_name:
+        visit(name)
+    return by_name
+
+
+def _timed_call(name, func, args):
+    start = time.perf_counter()
+    with metrics.timed(f"stage.{name}"):
+        value = func(*args)
+    return value, time.perf_counter() - start
+
+
+def run_stages(stages, io_workers=IO_WORKERS):
+    """
+    Runs the stage DAG, starting each stage as soon as its dependencies are done, and yields a
+    StageResult per stage in completion order so callers can show partial results early.
+    """
+    by_name = _check_graph(stages)
+    results = {}
+    pending = dict(by_name)
+    running = {}
+    io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="pipeline-io")
+
+    try:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if any(dep in results and not results[dep].ok for dep in stage.deps):
+                    del pending[name]
+                    results[name] = StageResult(name, error=StageSkipped(f"{name} skipped: a dependency failed"))
+                    yield results[name]
+                elif all(dep in results for dep in stage.deps):
+                    del pending[name]
+                    executor = io_pool if stage.lane == IO else _lane_executor(stage.lane)
+                    args = [results[dep].value for dep in stage.deps]
+                    running[executor.submit(metrics.run_in_context(_timed_call), name, stage.func, args)] = name
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    value, seconds = future.result()
+                    results[name] = StageResult(name, value=value, seconds=seconds)
+                except Exception as e:
+                    results[name] = StageResult(name, error=e)
+                yield results[name]
+    finally:
+        io_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_pipeline(stages, io_workers=IO_WORKERS):
+    """Runs the stages to completion and returns {name: StageResult}."""
+    return {result.name: result for result in run_stages(stages, io_workers)}
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from components import metrics
+from components.settings import (
+    cache_path, SPACY_MODEL, SUMMARIZER_BACKEND, SUMMARIZER_MODEL, SUMMARY_NUM_BEAMS,
+)
+
+# bump when the shape of article_data or the pipeline behaviour changes
+PIPELINE_VERSION = "3"
+ANALYSIS_VERSION = (
+    f"{PIPELINE_VERSION}|{SPACY_MODEL}|{SUMMARIZER_MODEL}|{SUMMARIZER_BACKEND}|beams={SUMMARY_NUM_BEAMS}"
+)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 5000
+
+_TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "mc_cid", "mc_eid", "ref", "ref_src", "cmpid"}
+
+
+def normalize_url(url):
+    """Lowercases scheme/host, drops fragments, default ports, tracking parameters and trailing slashes."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or "http"
+    host = (parts.hostname or "").lower()
+    if parts.port and not ((scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Content-addressed cache of whole-article analyses (the article_data dict shown by app.py).
+    Keyed by normalized URL, a hash of the extracted text and ANALYSIS_VERSION; backed by sqlite so
+    every session and process on the host shares it. Payloads are zlib-compressed JSON and the least
+    recently used entries are evicted once max_bytes or max_entries is exceeded.
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES,
+                 version=ANALYSIS_VERSION):
+        self.path = path or cache_path("results.sqlite3")
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.version = version
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY,"
+                " url TEXT NOT NULL,"
+                " payload BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS results_url ON results(url)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results(accessed_at)")
+
+    def make_key(self, url, article_text):
+        raw = f"{normalize_url(url)}\n{text_hash(article_text)}\n{self.version}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, url, article_text):
+        return self.get_by_key(self.make_key(url, article_text))
+
+    def get_by_key(self, key):
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT payload FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                metrics.incr("result_cache.miss")
+                return None
+            self._conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        metrics.incr("result_cache.hit")
+        return json.loads(zlib.decompress(row[0]).decode("utf-8"))
+
+    def put(self, url, article_text, article_data):
+        key = self.make_key(url, article_text)
+        payload = zlib.compress(json.dumps(article_data, ensure_ascii=False).encode("utf-8"))
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, url, payload, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, normalize_url(url), payload, len(payload), now, now),
+            )
+            self._evict()
+
+    def _evict(self):
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM results ORDER BY accessed_at ASC").fetchall()
+        doomed = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM results WHERE key = ?", doomed)
+
+    def invalidate(self, url):
+        """Drops every cached analysis of the URL (all text versions); returns the number removed."""
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM results WHERE url = ?", (normalize_url(url),)).rowcount
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM results")
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Process-wide ResultCache instance."""
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = ResultCache()
+        return _result_cache
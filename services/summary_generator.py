@@ -1,12 +1,69 @@
-from components.summarizer import generate_summary
-from services.file_handler import read_temp_file
+from components import metrics, model_client
+from components.extractor import analyze_text
+from components.summarizer import SUMMARY_ERROR_PREFIX, extractive_summary, generate_summaries, summary_failed
+from services.pipeline_scheduler import IO, run_with_deadline
+from services.article_context import ArticleContext, article_text
 
-def summarize_article(file_path):
+def summarize_article(article):
     """
-    Reads the translated article text from a temporary file and generates a summary.
+    Generates a summary of the article's English text.
+    `article` is an ArticleContext (the summary is also recorded on it) or a path to a text file.
+    A model failure comes back as SUMMARY_ERROR_PREFIX text and is recorded in artifacts["summary_error"].
     """
     try:
-        article_text = read_temp_file(file_path)
-        return generate_summary(article_text)
+        summary = model_client.summarize(article_text(article))
     except Exception as e:
-        return f"❌ Error generating summary: {e}"
+        summary = SUMMARY_ERROR_PREFIX + str(e)
+    if summary_failed(summary):
+        _record_failure(article, summary[len(SUMMARY_ERROR_PREFIX):])
+    else:
+        _record(article, summary)
+    return summary
+
+def _record(article, summary):
+    if isinstance(article, ArticleContext):
+        article.artifacts["summary"] = summary
+
+def summarize_articles(articles):
+    """
+    Batched summarize_article for many ArticleContexts (or paths); chunks of all articles share model batches.
+    """
+    summaries = generate_summaries([article_text(a) for a in articles])
+    for article, summary in zip(articles, summaries):
+        _record(article, summary)
+    return summaries
+
+def _record_failure(article, error):
+    metrics.incr("summary.model_failed")
+    if isinstance(article, ArticleContext):
+        article.artifacts["summary_error"] = error
+
+def summarize_article_within(article, deadline, lane=IO):
+    """
+    summarize_article run on the given model lane, if it finishes before `deadline` (time.monotonic(),
+    None for no limit). Returns the summary, or None when the model failed or did not finish in time;
+    a failure is also recorded in artifacts["summary_error"] of an ArticleContext.
+    """
+    text = article_text(article)
+    try:
+        finished, summary = run_with_deadline(lambda: model_client.summarize(text), deadline, lane)
+    except Exception as e:
+        _record_failure(article, str(e))
+        return None
+    if not finished:
+        # the model call may still complete later; it must not overwrite the fallback's summary
+        return None
+    if summary_failed(summary):
+        # generate_summary reports model errors as text; they must not be shown or cached as a summary
+        _record_failure(article, summary[len(SUMMARY_ERROR_PREFIX):])
+        return None
+    _record(article, summary)
+    return summary
+
+def summarize_article_extractive(article, analysis=None):
+    """Fast extractive summary from the article's spaCy analysis, used when the model runs out of time."""
+    if analysis is None:
+        analysis = article.analysis if isinstance(article, ArticleContext) else analyze_text(article_text(article))
+    summary = extractive_summary(analysis)
+    _record(article, summary)
+    return summary